@@ -5,6 +5,51 @@ import pyperclip
 import json
 from datetime import datetime
 import platform
+import heapq
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    from folder_display.exclude import PathFilter
+    from folder_display.index import NameIndex
+    from folder_display.scanner import Entry
+    from folder_display.stats import ScanStats
+except ImportError:
+    # Not installed, or an older release without these modules: use the library in this repository
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir,
+                                    os.pardir, "Python Package for Library", "folder-display-tool",
+                                    "python", "Version 3", "Code"))
+    # Forget the package found first, or the retry would get the same one back
+    for module_name in [name for name in sys.modules
+                        if name == "folder_display" or name.startswith("folder_display.")]:
+        del sys.modules[module_name]
+    from folder_display.exclude import PathFilter
+    from folder_display.index import NameIndex
+    from folder_display.scanner import Entry
+    from folder_display.stats import ScanStats
+
+# Lines sent from the scan thread to the UI in one message
+SCAN_BATCH_SIZE = 500
+# How often the UI drains the scan queue, and how much per tick
+SCAN_POLL_MS = 50
+SCAN_BATCHES_PER_POLL = 20
+# Children inserted into the lazy tree view per expand or "show more" click
+TREE_PAGE_SIZE = 1000
+# Lines inserted into the text widget per call when re-rendering a scan
+RENDER_CHUNK_SIZE = 5000
+# Longest long/invalid paths kept in memory for the problems window and report
+PROBLEM_PATHS_KEPT = 1000
+# Slowest folders and unreadable paths kept in a scan profile
+PROFILE_SLOWEST_KEPT = 20
+PROFILE_ERRORS_KEPT = 1000
+# Hide Node Modules: node_modules folders in any case, as on Windows and macOS file systems
+NODE_MODULES_PATTERN = "".join(f"[{c.lower()}{c.upper()}]" if c.isalpha() else c
+                               for c in "node_modules") + "/"
+
 
 class FolderStructureTool(tk.Tk):
     def __init__(self):
@@ -15,15 +60,30 @@ class FolderStructureTool(tk.Tk):
         self.configure(bg="#f5f5f5")
         self.resizable(True, True)  # Allow resizing for better viewing
 
-        # Path length tracking
-        self.max_path_length = 0
-        self.long_paths = []
-        self.invalid_paths = []
-        
         # Windows path length limit
         self.windows_path_limit = 260
         self.is_windows = platform.system() == "Windows"
 
+        # Path length tracking
+        self.offender_spool = None
+        self.reset_path_analysis()
+
+        # Background scan state
+        self.scan_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.scan_thread = None
+        # Scan model: (depth, name, is_dir, path length) per displayed entry, in display order.
+        # Display options are applied when rendering, so they can change without rescanning.
+        self.scan_model = []
+        self.scan_entries = 0
+        self.scan_started = 0.0
+        self.scan_profile = self.new_scan_profile()
+
+        # Search state: index over the scan model, matching rows and the current one
+        self.search_index = NameIndex()
+        self.search_matches = []
+        self.search_position = -1
+
         # Title Label
         self.title_label = tk.Label(self, text="Folder Structure Display Tool - Version 4",
                                     font=("Helvetica", 18, 'bold'), fg="#333", bg="#f5f5f5")
@@ -81,6 +141,7 @@ class FolderStructureTool(tk.Tk):
         self.show_path_lengths_var = tk.BooleanVar()
         self.show_path_lengths_check = tk.Checkbutton(self.top_frame, text="Show Path Lengths",
                                                       variable=self.show_path_lengths_var,
+                                                      command=self.rerender_structure,
                                                       font=("Helvetica", 10), bg="#f5f5f5")
         self.show_path_lengths_check.grid(row=0, column=3, padx=10)
 
@@ -88,6 +149,7 @@ class FolderStructureTool(tk.Tk):
         self.truncate_names_var = tk.BooleanVar()
         self.truncate_names_check = tk.Checkbutton(self.top_frame, text="Truncate Long Names",
                                                    variable=self.truncate_names_var,
+                                                   command=self.rerender_structure,
                                                    font=("Helvetica", 10), bg="#f5f5f5")
         self.truncate_names_check.grid(row=0, column=4, padx=10)
 
@@ -97,10 +159,33 @@ class FolderStructureTool(tk.Tk):
 
         self.save_as_var = tk.StringVar(value="None")
         self.save_as_menu = ttk.Combobox(self.top_frame, textvariable=self.save_as_var, state="readonly",
-                                         values=["None", "Text File", "HTML", "JSON", "Path Analysis Report"],
+                                         values=["None", "Text File", "HTML", "JSON", "Path Analysis Report",
+                                                 "Scan Profile"],
                                          font=("Helvetica", 10), width=20)
         self.save_as_menu.grid(row=1, column=1, padx=10, pady=5)
 
+        # Lazy Tree View Checkbutton
+        self.tree_view_var = tk.BooleanVar()
+        self.tree_view_check = tk.Checkbutton(self.top_frame, text="Lazy Tree View",
+                                              variable=self.tree_view_var, command=self.toggle_view,
+                                              font=("Helvetica", 10), bg="#f5f5f5")
+        self.tree_view_check.grid(row=1, column=2, padx=10, pady=5)
+
+        # Exclusion patterns (gitignore syntax, separated by commas or spaces)
+        self.exclude_frame = tk.Frame(self.top_frame, bg="#f5f5f5")
+        self.exclude_frame.grid(row=1, column=3, padx=10, pady=5)
+        self.exclude_label = tk.Label(self.exclude_frame, text="Exclude:", font=("Helvetica", 10), bg="#f5f5f5")
+        self.exclude_label.pack(side="left")
+        self.exclude_entry = tk.Entry(self.exclude_frame, font=("Helvetica", 10), width=24)
+        self.exclude_entry.pack(side="left", padx=5)
+
+        # Use .gitignore Checkbutton
+        self.use_gitignore_var = tk.BooleanVar()
+        self.use_gitignore_check = tk.Checkbutton(self.top_frame, text="Use .gitignore",
+                                                  variable=self.use_gitignore_var,
+                                                  font=("Helvetica", 10), bg="#f5f5f5")
+        self.use_gitignore_check.grid(row=1, column=4, padx=10, pady=5)
+
         # Text Widget for Folder Structure
         self.text_display = scrolledtext.ScrolledText(self, wrap=tk.WORD, height=22, width=120,
                                                       font=("Courier", 9), bg="#f4f4f9", fg="#333",
@@ -111,6 +196,34 @@ class FolderStructureTool(tk.Tk):
         self.text_display.tag_configure("long_path", foreground="#ff8c00")
         self.text_display.tag_configure("invalid_path", foreground="#dc143c", background="#ffe4e1")
         self.text_display.tag_configure("normal_path", foreground="#333")
+        self.text_display.tag_configure("highlight", background="yellow", foreground="black")
+        self.text_display.tag_configure("current_match", background="#ff9632", foreground="black")
+
+        # Lazy Tree View, shown instead of the text widget when enabled.
+        # Folders are listed only when expanded, so large trees stay responsive.
+        self.tree_frame = tk.Frame(self, bg="#f5f5f5")
+        self.tree_view = ttk.Treeview(self.tree_frame, columns=("length",), selectmode="browse")
+        self.tree_view.heading("#0", text="Name")
+        self.tree_view.heading("length", text="Path Length")
+        self.tree_view.column("length", width=100, anchor="e", stretch=False)
+        self.tree_scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree_view.yview)
+        self.tree_view.configure(yscrollcommand=self.tree_scrollbar.set)
+        self.tree_scrollbar.pack(side="right", fill="y")
+        self.tree_view.pack(side="left", fill="both", expand=True)
+        self.tree_view.tag_configure("long_path", foreground="#ff8c00")
+        self.tree_view.tag_configure("invalid_path", foreground="#dc143c", background="#ffe4e1")
+        self.tree_view.tag_configure("normal_path", foreground="#333")
+        self.tree_view.tag_configure("more", foreground="#008CBA")
+        self.tree_view.bind("<<TreeviewOpen>>", self.on_tree_open)
+        self.tree_view.bind("<<TreeviewSelect>>", self.on_tree_select)
+        # item id -> (path, path length, is_dir) for loaded folders and files
+        self.tree_items = {}
+        # folder item ids whose children have not been listed yet
+        self.tree_unloaded = set()
+        # "show more" item id -> (parent item, parent path length, remaining entries)
+        self.tree_more = {}
+        # PathFilter for the folders listed in the tree view, anchored at the selected folder
+        self.tree_filter = None
 
         # Search Bar
         self.search_frame = tk.Frame(self, bg="#f5f5f5")
@@ -121,12 +234,29 @@ class FolderStructureTool(tk.Tk):
 
         self.search_entry = tk.Entry(self.search_frame, font=("Helvetica", 12), width=40)
         self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind("<Return>", lambda event: self.search_in_structure())
+
+        self.search_mode_var = tk.StringVar(value="Substring")
+        self.search_mode_menu = ttk.Combobox(self.search_frame, textvariable=self.search_mode_var,
+                                             state="readonly", values=["Substring", "Glob", "Regex"],
+                                             font=("Helvetica", 10), width=10)
+        self.search_mode_menu.pack(side="left", padx=5)
 
         self.search_button = tk.Button(self.search_frame, text="Search", command=self.search_in_structure,
                                        font=("Helvetica", 10), bg="#008CBA", fg="white",
                                        relief="flat", padx=10, pady=5)
         self.search_button.pack(side="left", padx=5)
 
+        self.previous_match_button = tk.Button(self.search_frame, text="Previous",
+                                               command=lambda: self.jump_to_match(-1),
+                                               font=("Helvetica", 10), relief="flat", padx=10, pady=5)
+        self.previous_match_button.pack(side="left", padx=2)
+
+        self.next_match_button = tk.Button(self.search_frame, text="Next",
+                                           command=lambda: self.jump_to_match(1),
+                                           font=("Helvetica", 10), relief="flat", padx=10, pady=5)
+        self.next_match_button.pack(side="left", padx=2)
+
         # Buttons Frame
         self.buttons_frame = tk.Frame(self, bg="#f5f5f5")
         self.buttons_frame.pack(pady=10)
@@ -143,6 +273,12 @@ class FolderStructureTool(tk.Tk):
                                          relief="flat", padx=20, pady=5, cursor="hand2")
         self.problems_button.pack(side="left", padx=10)
 
+        # Cancel Scan Button
+        self.cancel_button = tk.Button(self.buttons_frame, text="Cancel Scan", command=self.cancel_scan,
+                                       font=("Helvetica", 12), bg="#777", fg="white",
+                                       relief="flat", padx=20, pady=5, cursor="hand2", state="disabled")
+        self.cancel_button.pack(side="left", padx=10)
+
         # Status Bar
         self.status_label = tk.Label(self, text="Welcome! Select a folder to get started.",
                                      font=("Helvetica", 10), bg="#f5f5f5", fg="#777")
@@ -166,6 +302,46 @@ class FolderStructureTool(tk.Tk):
         # For folders or files without extension, simple truncation
         return name[:max_length - 3] + "..."
 
+    def reset_path_analysis(self):
+        """Forget the statistics of the previous scan.
+
+        Only counts and the PROBLEM_PATHS_KEPT longest offenders are kept in
+        memory (as min-heaps of (length, sequence, path)); every offender is
+        spooled to a temporary file, read back only when a report is exported.
+        """
+        self.max_path_length = 0
+        self.long_count = 0
+        self.invalid_count = 0
+        self.long_paths = []
+        self.invalid_paths = []
+        self.offender_sequence = 0
+        if self.offender_spool is not None:
+            self.offender_spool.close()
+        self.offender_spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+
+    def keep_longest(self, heap, path, path_length):
+        """Push a path onto a bounded heap of the longest paths"""
+        self.offender_sequence += 1
+        if len(heap) < PROBLEM_PATHS_KEPT:
+            heapq.heappush(heap, (path_length, self.offender_sequence, path))
+        elif path_length > heap[0][0]:
+            heapq.heapreplace(heap, (path_length, self.offender_sequence, path))
+
+    def longest_paths(self, heap):
+        """(path, length) pairs of a bounded heap, longest first"""
+        return [(path, length) for length, _, path in sorted(heap, reverse=True)]
+
+    def iter_offenders(self):
+        """Read back every spooled (path, length, is_invalid) in scan order"""
+        self.offender_spool.flush()
+        self.offender_spool.seek(0)
+        for line in self.offender_spool:
+            length, path = line.rstrip("\n").split("\t", 1)
+            length = int(length)
+            # Paths are stored JSON-encoded so tabs and newlines in names survive
+            yield json.loads(path), length, self.is_windows and length > self.windows_path_limit
+        self.offender_spool.seek(0, os.SEEK_END)
+
     def get_full_path_length(self, path):
         """Get the actual full path length"""
         try:
@@ -175,9 +351,13 @@ class FolderStructureTool(tk.Tk):
         except:
             return len(path)
 
-    def analyze_path(self, path):
-        """Analyze path length and categorize it"""
-        path_length = self.get_full_path_length(path)
+    def analyze_path(self, path, path_length=None):
+        """Analyze path length and categorize it.
+
+        Pass path_length (parent length + separator + name) to skip the abspath call.
+        """
+        if path_length is None:
+            path_length = self.get_full_path_length(path)
         
         # Update maximum path length
         if path_length > self.max_path_length:
@@ -185,13 +365,33 @@ class FolderStructureTool(tk.Tk):
         
         # Categorize paths
         if path_length > 200:
-            self.long_paths.append((path, path_length))
-        
-        if self.is_windows and path_length > self.windows_path_limit:
-            self.invalid_paths.append((path, path_length))
+            self.record_long_path(path, path_length)
         
         return path_length
 
+    def record_long_path(self, path, path_length):
+        """Count a path over 200 characters, keeping it if it is among the longest"""
+        self.long_count += 1
+        self.keep_longest(self.long_paths, path, path_length)
+        self.offender_spool.write(f"{path_length}\t{json.dumps(path)}\n")
+
+        if self.is_windows and path_length > self.windows_path_limit:
+            self.invalid_count += 1
+            self.keep_longest(self.invalid_paths, path, path_length)
+
+    def record_scan_batch(self, entries, long_paths):
+        """Fold a batch from the scan worker into the path statistics.
+
+        The worker only measures paths and collects the long ones; the
+        statistics are read and written on the UI thread alone.
+        """
+        if entries:
+            longest = max(entry[3] for entry in entries)
+            if longest > self.max_path_length:
+                self.max_path_length = longest
+        for path, path_length in long_paths:
+            self.record_long_path(path, path_length)
+
     def get_path_category(self, path_length):
         """Determine the category of a path based on its length"""
         if self.is_windows and path_length > self.windows_path_limit:
@@ -202,93 +402,348 @@ class FolderStructureTool(tk.Tk):
             return "normal_path"
 
     def select_folder(self):
+        if self.scan_thread is not None:
+            return
         self.folder_path = filedialog.askdirectory()
         if self.folder_path:
             # Reset analysis data
-            self.max_path_length = 0
-            self.long_paths = []
-            self.invalid_paths = []
+            self.reset_path_analysis()
             
             self.text_display.delete(1.0, tk.END)
+            self.reset_scan_model()
+            self.clear_tree_view()
+            if self.tree_view_var.get():
+                self.load_tree_root(self.folder_path)
+                return
             self.update_status(f"Analyzing structure of: {self.folder_path}")
             self.display_structure(self.folder_path)
-            self.update_analysis_display()
 
     def update_analysis_display(self):
         """Update the analysis display with current statistics"""
         self.max_length_label.config(text=f"Max Path Length: {self.max_path_length}")
-        self.long_paths_label.config(text=f"Long Paths (>200 chars): {len(self.long_paths)}")
-        self.invalid_paths_label.config(text=f"Invalid Paths (>{self.windows_path_limit} chars): {len(self.invalid_paths)}")
+        self.long_paths_label.config(text=f"Long Paths (>200 chars): {self.long_count}")
+        self.invalid_paths_label.config(text=f"Invalid Paths (>{self.windows_path_limit} chars): {self.invalid_count}")
 
     def display_structure(self, startpath):
-        include_hidden = self.include_hidden_var.get()
-        hide_node_modules = self.hide_node_modules_var.get()
+        """Start scanning startpath on a worker thread; results arrive through scan_queue"""
+        self.scan_profile = self.new_scan_profile()
+        options = {
+            "include_hidden": self.include_hidden_var.get(),
+            "exclude_filter": self.exclude_filter(),
+            "profile": self.scan_profile,
+        }
+        self.cancel_event.clear()
+        self.scan_queue = queue.Queue()
+        self.reset_scan_model()
+        self.scan_entries = 0
+        self.scan_started = time.monotonic()
+        self.select_folder_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.scan_thread = threading.Thread(target=self.scan_worker,
+                                            args=(startpath, options, self.scan_queue, self.cancel_event),
+                                            daemon=True)
+        self.scan_thread.start()
+        self.after(SCAN_POLL_MS, self.poll_scan_queue, startpath)
+
+    def new_scan_profile(self):
+        """Empty ScanStats for the next scan"""
+        return ScanStats(slowest=PROFILE_SLOWEST_KEPT, errors_kept=PROFILE_ERRORS_KEPT)
+
+    def scan_worker(self, startpath, options, scan_queue, cancel_event):
+        """Walk the folder and send batches of model entries to the UI thread.
+
+        Each batch goes out as (entries, long_paths): the (path, length) of
+        its paths over 200 characters, which record_scan_batch counts on the
+        UI thread. The worker touches no state of the window.
+        """
+        batch = []
+        long_paths = []
+        # Excluded folders are removed from dirs before os.walk descends, so they are never listed
+        exclude_filter = options["exclude_filter"]
+        exclude_filter.start(startpath)
+        profile = options["profile"]
+
+        def record_error(error):
+            # os.walk onerror callback: the folder could not be listed and is skipped
+            profile.record(error.filename, 0, 0, 0.0, 1, error)
+
+        try:
+            base_length = self.get_full_path_length(startpath) - len(startpath)
+            # os.walk lists a folder just before yielding it, so the time since the
+            # previous folder was handled is this folder's listing time
+            listed = time.perf_counter()
+            for root, dirs, files in os.walk(startpath, onerror=record_error):
+                listing_seconds = time.perf_counter() - listed
+                listing_entries = len(dirs) + len(files)
+                if cancel_event.is_set():
+                    break
+                if not options["include_hidden"]:
+                    dirs[:] = [d for d in dirs if not d.startswith('.')]
+                    files = [f for f in files if not f.startswith('.')]
+                rules = exclude_filter.rules_for(root)
+                if rules is not None:
+                    dirs[:] = [d for d in dirs if not rules.excludes(d, True)]
+                    files = [f for f in files if not rules.excludes(f, False)]
+                # One scandir per folder, plus the .gitignore read
+                profile.record(root, listing_entries, len(dirs), listing_seconds,
+                               2 if exclude_filter.read_gitignore else 1)
+
+                depth = root.replace(startpath, '').count(os.sep)
+
+                # Measure the current directory path; os.walk roots extend startpath,
+                # so only startpath itself needs an abspath call
+                current_path_length = base_length + len(root)
+                if current_path_length > 200:
+                    long_paths.append((root, current_path_length))
+                batch.append((depth, os.path.basename(root), True, current_path_length))
+
+                # File lengths follow from the folder's; no abspath call per file
+                for file in files:
+                    file_path_length = current_path_length + len(os.sep) + len(file)
+                    if file_path_length > 200:
+                        long_paths.append((os.path.join(root, file), file_path_length))
+                    batch.append((depth + 1, file, False, file_path_length))
+                    if len(batch) >= SCAN_BATCH_SIZE:
+                        scan_queue.put(("entries", (batch, long_paths)))
+                        batch, long_paths = [], []
+                        if cancel_event.is_set():
+                            break
+
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    scan_queue.put(("entries", (batch, long_paths)))
+                    batch, long_paths = [], []
+                listed = time.perf_counter()
+            scan_queue.put(("entries", (batch, long_paths)))
+            scan_queue.put(("done", cancel_event.is_set()))
+        except Exception as e:
+            scan_queue.put(("error", str(e)))
+
+    def reset_scan_model(self):
+        """Drop the previous scan's model, search index and matches"""
+        self.scan_model = []
+        self.search_index = NameIndex()
+        self.search_matches = []
+        self.search_position = -1
+
+    def index_names(self, entries):
+        """Add a batch of model entries to the name index; entry ids are rows + 1"""
+        add = self.search_index.add
+        for entry_id, (depth, name, is_dir, _) in enumerate(entries, len(self.scan_model) + 1):
+            add(Entry(entry_id, 0, depth, name, is_dir, ''))
+
+    def render_entries(self, entries):
+        """Format model entries as (line_text, category) pairs with the current display options"""
         show_path_lengths = self.show_path_lengths_var.get()
         truncate_names = self.truncate_names_var.get()
-        
-        structure_output = ""
-        structure_lines = []
-
-        for root, dirs, files in os.walk(startpath):
-            if not include_hidden:
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                files = [f for f in files if not f.startswith('.')]
-            if hide_node_modules:
-                dirs[:] = [d for d in dirs if d.lower() != 'node_modules']
-
-            depth = root.replace(startpath, '').count(os.sep)
-            indent = ' ' * 4 * depth
-            
-            # Analyze current directory path
-            current_path_length = self.analyze_path(root)
-            folder_name = os.path.basename(root)
-            
+        truncate_name = self.truncate_name
+        get_path_category = self.get_path_category
+        lines = []
+        for depth, name, is_dir, path_length in entries:
             if truncate_names:
-                folder_name = self.truncate_name(folder_name)
-            
-            line_text = f"{indent}{folder_name}/"
+                name = truncate_name(name)
+            line_text = ' ' * 4 * depth + name
+            if is_dir:
+                line_text += "/"
             if show_path_lengths:
-                line_text += f" [{current_path_length} chars]"
-            
-            line_text += "\n"
-            structure_output += line_text
-            
-            # Store line info for coloring
-            path_category = self.get_path_category(current_path_length)
-            structure_lines.append((line_text, path_category))
-
-            subindent = ' ' * 4 * (depth + 1)
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_path_length = self.analyze_path(file_path)
-                
-                display_name = file
-                if truncate_names:
-                    display_name = self.truncate_name(file)
-                
-                line_text = f"{subindent}{display_name}"
-                if show_path_lengths:
-                    line_text += f" [{file_path_length} chars]"
-                
-                line_text += "\n"
-                structure_output += line_text
-                
-                # Store line info for coloring
-                path_category = self.get_path_category(file_path_length)
-                structure_lines.append((line_text, path_category))
-
-        # Insert text with appropriate coloring
-        current_pos = "1.0"
-        for line_text, category in structure_lines:
-            start_pos = current_pos
-            self.text_display.insert(tk.END, line_text, category)
-            # Calculate next position
-            lines_added = line_text.count('\n')
-            if lines_added > 0:
-                current_pos = f"{float(current_pos) + lines_added}"
-            else:
-                current_pos = f"{current_pos}+{len(line_text)}c"
+                line_text += f" [{path_length} chars]"
+            lines.append((line_text + "\n", get_path_category(path_length)))
+        return lines
+
+    def insert_lines(self, lines):
+        """Append rendered lines to the text widget, a chunk of lines per insert call"""
+        for start in range(0, len(lines), RENDER_CHUNK_SIZE):
+            chunk = lines[start:start + RENDER_CHUNK_SIZE]
+            # One insert call per chunk: text, tag, text, tag, ...
+            self.text_display.insert(tk.END, *[part for line in chunk for part in line])
+
+    def rendered_output(self):
+        """The whole scan as text, rendered from the model"""
+        return "".join(line_text for line_text, _ in self.render_entries(self.scan_model))
+
+    def rerender_structure(self):
+        """Apply changed display options to the current scan without touching the disk"""
+        if self.tree_items:
+            truncate_names = self.truncate_names_var.get()
+            for item, (path, _, is_dir) in self.tree_items.items():
+                name = os.path.basename(path.rstrip(os.sep)) or path
+                display_name = self.truncate_name(name) if truncate_names else name
+                if is_dir:
+                    display_name += "/"
+                self.tree_view.item(item, text=display_name)
+        if not self.scan_model:
+            return
+        started = time.monotonic()
+        self.text_display.delete(1.0, tk.END)
+        self.insert_lines(self.render_entries(self.scan_model))
+        self.highlight_matches()
+        if self.scan_thread is None:
+            self.update_status(f"Re-rendered {len(self.scan_model)} entries in "
+                               f"{time.monotonic() - started:.2f}s")
+
+    def poll_scan_queue(self, startpath):
+        """Move scanned lines from the worker into the text widget"""
+        finished = None
+        try:
+            for _ in range(SCAN_BATCHES_PER_POLL):
+                kind, payload = self.scan_queue.get_nowait()
+                if kind == "entries":
+                    entries, long_paths = payload
+                    self.record_scan_batch(entries, long_paths)
+                    if entries:
+                        self.insert_lines(self.render_entries(entries))
+                        self.index_names(entries)
+                        self.scan_model.extend(entries)
+                        self.scan_entries += len(entries)
+                else:
+                    finished = (kind, payload)
+                    break
+        except queue.Empty:
+            pass
+
+        elapsed = time.monotonic() - self.scan_started
+        rate = self.scan_entries / elapsed if elapsed > 0 else 0
+        if finished is None:
+            self.update_status(f"Scanning {startpath}: {self.scan_entries} entries "
+                               f"({rate:,.0f}/s), {elapsed:.1f}s elapsed; {self.scan_profile.summary()}")
+            self.update_analysis_display()
+            self.after(SCAN_POLL_MS, self.poll_scan_queue, startpath)
+            return
+
+        self.scan_thread = None
+        self.select_folder_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.update_analysis_display()
+        kind, payload = finished
+        if kind == "error":
+            self.update_status(f"Scan failed after {elapsed:.1f}s: {payload}")
+            return
+        if payload:
+            self.update_status(f"Scan cancelled after {self.scan_entries} entries, {elapsed:.1f}s")
+            return
+        self.update_status(f"Scanned {self.scan_entries} entries in {elapsed:.1f}s ({rate:,.0f}/s); "
+                           f"{self.scan_profile.summary()}")
+        self.handle_save_option(startpath, self.rendered_output())
+
+    def cancel_scan(self):
+        """Ask the worker to stop; it checks between directories and batches"""
+        if self.scan_thread is not None:
+            self.cancel_event.set()
+            self.update_status("Cancelling scan...")
+
+    def toggle_view(self):
+        """Swap between the text display and the lazy tree view"""
+        if self.tree_view_var.get():
+            self.text_display.pack_forget()
+            self.tree_frame.pack(pady=10, fill="both", expand=True, before=self.search_frame)
+            folder_path = getattr(self, 'folder_path', None)
+            if folder_path and not self.tree_items:
+                self.load_tree_root(folder_path)
+        else:
+            self.tree_frame.pack_forget()
+            self.text_display.pack(pady=10, fill="both", expand=True, before=self.search_frame)
+
+    def clear_tree_view(self):
+        self.tree_view.delete(*self.tree_view.get_children())
+        self.tree_items.clear()
+        self.tree_filter = None
+        self.tree_unloaded.clear()
+        self.tree_more.clear()
+
+    def load_tree_root(self, path):
+        """Show the selected folder as the single top-level tree item"""
+        path_length = self.analyze_path(path)
+        item = self.insert_tree_item("", os.path.basename(path.rstrip(os.sep)) or path,
+                                     path, path_length, True)
+        self.tree_view.item(item, open=True)
+        self.load_tree_children(item)
+        self.update_analysis_display()
+        self.update_status(f"Tree view of {path}: expand folders to list them")
+
+    def insert_tree_item(self, parent, name, path, path_length, is_dir):
+        """Insert one tree row; folders get a placeholder child so they can be expanded"""
+        display_name = self.truncate_name(name) if self.truncate_names_var.get() else name
+        if is_dir:
+            display_name += "/"
+        item = self.tree_view.insert(parent, "end", text=display_name, values=(path_length,),
+                                     tags=(self.get_path_category(path_length),))
+        self.tree_items[item] = (path, path_length, is_dir)
+        if is_dir:
+            self.tree_view.insert(item, "end", text="Loading...")
+            self.tree_unloaded.add(item)
+        return item
+
+    def exclude_filter(self):
+        """Compile the Exclude field, plus node_modules when Hide Node Modules is set"""
+        patterns = self.exclude_entry.get().replace(",", " ").split()
+        if self.hide_node_modules_var.get():
+            patterns.append(NODE_MODULES_PATTERN)
+        return PathFilter(patterns, self.use_gitignore_var.get())
+
+    def tree_exclude_rules(self, path):
+        """Exclusion rules for a folder in the tree view (None when nothing can match)"""
+        if self.tree_filter is None:
+            self.tree_filter = self.exclude_filter()
+            self.tree_filter.start(self.folder_path)
+        return self.tree_filter.rules_for(path)
+
+    def list_tree_folder(self, path):
+        """List a folder as sorted (name, is_dir) pairs, folders first"""
+        include_hidden = self.include_hidden_var.get()
+        rules = self.tree_exclude_rules(path)
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if not include_hidden and name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if rules is not None and rules.excludes(name, is_dir):
+                    continue
+                entries.append((name, is_dir))
+        entries.sort(key=lambda e: (not e[1], e[0].casefold()))
+        return entries
 
+    def load_tree_children(self, item):
+        """List a folder the first time it is expanded"""
+        if item not in self.tree_unloaded:
+            return
+        self.tree_unloaded.discard(item)
+        self.tree_view.delete(*self.tree_view.get_children(item))
+        path, path_length, _ = self.tree_items[item]
+        try:
+            entries = self.list_tree_folder(path)
+        except OSError as e:
+            self.tree_view.insert(item, "end", text=f"<{e.strerror}>")
+            return
+        self.insert_tree_page(item, path, path_length, entries)
+
+    def insert_tree_page(self, item, path, path_length, entries):
+        """Insert up to TREE_PAGE_SIZE children, then a "show more" row for the rest"""
+        for name, is_dir in entries[:TREE_PAGE_SIZE]:
+            # Child length is the parent's plus a separator and the name; no abspath call
+            child_path = os.path.join(path, name)
+            child_length = self.analyze_path(child_path, path_length + len(os.sep) + len(name))
+            self.insert_tree_item(item, name, child_path, child_length, is_dir)
+        remaining = entries[TREE_PAGE_SIZE:]
+        if remaining:
+            more = self.tree_view.insert(item, "end", text=f"Show {len(remaining)} more...", tags=("more",))
+            self.tree_more[more] = (item, path, path_length, remaining)
+        self.update_analysis_display()
+
+    def on_tree_open(self, event):
+        self.load_tree_children(self.tree_view.focus())
+
+    def on_tree_select(self, event):
+        for item in self.tree_view.selection():
+            if item in self.tree_more:
+                parent, path, path_length, remaining = self.tree_more.pop(item)
+                self.tree_view.delete(item)
+                self.insert_tree_page(parent, path, path_length, remaining)
+
+    def handle_save_option(self, startpath, structure_output):
         # Handle save options
         selected_save_as = self.save_as_var.get()
         if selected_save_as == "Text File":
@@ -299,6 +754,8 @@ class FolderStructureTool(tk.Tk):
             self.export_as_json(structure_output)
         elif selected_save_as == "Path Analysis Report":
             self.export_path_analysis_report()
+        elif selected_save_as == "Scan Profile":
+            self.export_scan_profile()
 
     def save_to_text_file(self, startpath, structure_output):
         file_path = filedialog.asksaveasfilename(defaultextension=".txt",
@@ -315,25 +772,64 @@ class FolderStructureTool(tk.Tk):
             self.update_status("Folder structure copied to clipboard!")
 
     def search_in_structure(self):
+        """Look the query up in the name index, highlight every match and jump to the first"""
         search_term = self.search_entry.get().strip()
+        self.search_matches = []
+        self.search_position = -1
+        self.highlight_matches()
+        if not search_term:
+            return
+        if self.tree_view_var.get():
+            self.update_status("Search works on the text view; turn off Lazy Tree View to search")
+            return
+        started = time.monotonic()
+        try:
+            entry_ids = self.search_index.search_ids(search_term, self.search_mode_var.get().lower())
+            self.search_matches = [entry_id - 1 for entry_id in entry_ids]
+        except re.error as e:
+            self.update_status(f"Invalid pattern '{search_term}': {e}")
+            return
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.highlight_matches()
+        self.update_status(f"Search completed for '{search_term}' - "
+                           f"{len(self.search_matches)} matches found in {elapsed_ms:.0f} ms!")
+        if self.search_matches:
+            self.jump_to_match(1)
+
+    def highlight_matches(self):
+        """Tag the names on every matching line, a chunk of lines per tag_add call"""
         self.text_display.tag_remove("highlight", "1.0", tk.END)
-        if search_term:
-            idx = "1.0"
-            count = 0
-            while True:
-                idx = self.text_display.search(search_term, idx, nocase=1, stopindex=tk.END)
-                if not idx:
-                    break
-                end_idx = f"{idx}+{len(search_term)}c"
-                self.text_display.tag_add("highlight", idx, end_idx)
-                self.text_display.tag_config("highlight", background="yellow", foreground="black")
-                idx = end_idx
-                count += 1
-            self.update_status(f"Search completed for '{search_term}' - {count} matches found!")
+        self.text_display.tag_remove("current_match", "1.0", tk.END)
+        for start in range(0, len(self.search_matches), RENDER_CHUNK_SIZE):
+            ranges = []
+            for row in self.search_matches[start:start + RENDER_CHUNK_SIZE]:
+                line = row + 1
+                ranges += [f"{line}.{4 * self.scan_model[row][0]}", f"{line}.end"]
+            self.text_display.tag_add("highlight", *ranges)
+        if self.search_position >= 0:
+            self.mark_current_match()
+
+    def jump_to_match(self, step):
+        """Move to the next (step 1) or previous (step -1) match and scroll it into view"""
+        if not self.search_matches:
+            return
+        self.search_position = (self.search_position + step) % len(self.search_matches)
+        self.mark_current_match()
+        row = self.search_matches[self.search_position]
+        self.update_status(f"Match {self.search_position + 1} of {len(self.search_matches)}: "
+                           f"{self.scan_model[row][1]}")
+
+    def mark_current_match(self):
+        line = self.search_matches[self.search_position] + 1
+        self.text_display.tag_remove("current_match", "1.0", tk.END)
+        self.text_display.tag_add("current_match", f"{line}.0", f"{line}.end")
+        self.text_display.tag_raise("current_match")
+        self.text_display.mark_set(tk.INSERT, f"{line}.0")
+        self.text_display.see(f"{line}.0")
 
     def show_path_problems(self):
         """Show a detailed window with path problems"""
-        if not self.long_paths and not self.invalid_paths:
+        if not self.long_count and not self.invalid_count:
             messagebox.showinfo("Path Analysis", "No path length problems found!")
             return
         
@@ -355,28 +851,52 @@ class FolderStructureTool(tk.Tk):
         # Invalid paths tab
         if self.invalid_paths:
             invalid_frame = ttk.Frame(notebook)
-            notebook.add(invalid_frame, text=f"Invalid Paths ({len(self.invalid_paths)})")
+            notebook.add(invalid_frame, text=f"Invalid Paths ({self.invalid_count})")
             
             invalid_text = scrolledtext.ScrolledText(invalid_frame, wrap=tk.WORD, height=20, width=90,
                                                      font=("Courier", 10))
             invalid_text.pack(fill="both", expand=True, padx=10, pady=10)
             
-            invalid_text.insert(tk.END, f"Paths exceeding Windows {self.windows_path_limit}-character limit:\n\n")
-            for path, length in sorted(self.invalid_paths, key=lambda x: x[1], reverse=True):
-                invalid_text.insert(tk.END, f"[{length} chars] {path}\n\n")
+            invalid_text.insert(tk.END, f"Paths exceeding Windows {self.windows_path_limit}-character limit"
+                                        f"{self.shown_of(self.invalid_paths, self.invalid_count)}:\n\n")
+            invalid_text.insert(tk.END, "".join(f"[{length} chars] {path}\n\n"
+                                                for path, length in self.longest_paths(self.invalid_paths)))
         
         # Long paths tab
         if self.long_paths:
             long_frame = ttk.Frame(notebook)
-            notebook.add(long_frame, text=f"Long Paths ({len(self.long_paths)})")
+            notebook.add(long_frame, text=f"Long Paths ({self.long_count})")
             
             long_text = scrolledtext.ScrolledText(long_frame, wrap=tk.WORD, height=20, width=90,
                                                   font=("Courier", 10))
             long_text.pack(fill="both", expand=True, padx=10, pady=10)
             
-            long_text.insert(tk.END, "Paths longer than 200 characters:\n\n")
-            for path, length in sorted(self.long_paths, key=lambda x: x[1], reverse=True):
-                long_text.insert(tk.END, f"[{length} chars] {path}\n\n")
+            long_text.insert(tk.END, f"Paths longer than 200 characters"
+                                     f"{self.shown_of(self.long_paths, self.long_count)}:\n\n")
+            long_text.insert(tk.END, "".join(f"[{length} chars] {path}\n\n"
+                                             for path, length in self.longest_paths(self.long_paths)))
+
+    def shown_of(self, heap, total):
+        """Note appended to a heading when only the longest paths are listed"""
+        if len(heap) < total:
+            return f" (longest {len(heap)} of {total})"
+        return ""
+
+    def export_scan_profile(self):
+        """Save the last scan's timings, errors and slowest folders as JSON"""
+        file_path = filedialog.asksaveasfilename(defaultextension=".json",
+                                                 filetypes=[("JSON files", "*.json")])
+        if not file_path:
+            return
+        profile = {"scanned_folder": getattr(self, 'folder_path', 'Unknown'),
+                   "profile_date": datetime.now().isoformat()}
+        profile.update(self.scan_profile.to_dict())
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(profile, f, indent=2, ensure_ascii=False)
+            self.update_status(f"Scan profile saved to {file_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save scan profile: {str(e)}")
 
     def export_path_analysis_report(self):
         """Export a detailed path analysis report"""
@@ -389,17 +909,26 @@ class FolderStructureTool(tk.Tk):
             "analysis_date": datetime.now().isoformat(),
             "scanned_folder": getattr(self, 'folder_path', 'Unknown'),
             "max_path_length": self.max_path_length,
-            "total_long_paths": len(self.long_paths),
-            "total_invalid_paths": len(self.invalid_paths),
+            "total_long_paths": self.long_count,
+            "total_invalid_paths": self.invalid_count,
             "windows_path_limit": self.windows_path_limit,
-            "long_paths": [{"path": path, "length": length} for path, length in self.long_paths],
-            "invalid_paths": [{"path": path, "length": length} for path, length in self.invalid_paths]
         }
         
         try:
             if file_path.endswith('.json'):
+                # The full path lists are streamed from the spool, one item per line
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(report_data, f, indent=2, ensure_ascii=False)
+                    f.write(json.dumps(report_data, indent=2, ensure_ascii=False)[:-2])
+                    for key, invalid_only in (("long_paths", False), ("invalid_paths", True)):
+                        f.write(f',\n  "{key}": [')
+                        separator = "\n    "
+                        for path, length, is_invalid in self.iter_offenders():
+                            if is_invalid or not invalid_only:
+                                f.write(separator + json.dumps({"path": path, "length": length},
+                                                               ensure_ascii=False))
+                                separator = ",\n    "
+                        f.write("\n  ]")
+                    f.write("\n}\n")
             else:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write("PATH LENGTH ANALYSIS REPORT\n")
@@ -410,17 +939,25 @@ class FolderStructureTool(tk.Tk):
                     f.write(f"Long Paths (>200 chars): {report_data['total_long_paths']}\n")
                     f.write(f"Invalid Paths (>{self.windows_path_limit} chars): {report_data['total_invalid_paths']}\n\n")
                     
-                    if self.invalid_paths:
-                        f.write("INVALID PATHS (EXCEEDING WINDOWS LIMIT):\n")
+                    if self.invalid_count:
+                        f.write(f"INVALID PATHS (EXCEEDING WINDOWS LIMIT)"
+                                f"{self.shown_of(self.invalid_paths, self.invalid_count)}:\n")
                         f.write("-" * 50 + "\n")
-                        for path, length in sorted(self.invalid_paths, key=lambda x: x[1], reverse=True):
+                        for path, length in self.longest_paths(self.invalid_paths):
                             f.write(f"[{length} chars] {path}\n")
                         f.write("\n")
                     
-                    if self.long_paths:
-                        f.write("LONG PATHS (>200 CHARACTERS):\n")
+                    if self.long_count:
+                        f.write(f"LONG PATHS (>200 CHARACTERS)"
+                                f"{self.shown_of(self.long_paths, self.long_count)}:\n")
+                        f.write("-" * 50 + "\n")
+                        for path, length in self.longest_paths(self.long_paths):
+                            f.write(f"[{length} chars] {path}\n")
+                    
+                    if self.long_count > len(self.long_paths):
+                        f.write("\nALL LONG PATHS (IN SCAN ORDER):\n")
                         f.write("-" * 50 + "\n")
-                        for path, length in sorted(self.long_paths, key=lambda x: x[1], reverse=True):
+                        for path, length, _ in self.iter_offenders():
                             f.write(f"[{length} chars] {path}\n")
             
             self.update_status(f"Path analysis report saved to {file_path}")
@@ -452,8 +989,8 @@ class FolderStructureTool(tk.Tk):
                     <h2>Folder Structure Analysis - Version 4</h2>
                     <p>Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
                     <p>Max Path Length: {self.max_path_length} characters</p>
-                    <p>Long Paths (>200 chars): {len(self.long_paths)}</p>
-                    <p>Invalid Paths (>{self.windows_path_limit} chars): {len(self.invalid_paths)}</p>
+                    <p>Long Paths (>200 chars): {self.long_count}</p>
+                    <p>Invalid Paths (>{self.windows_path_limit} chars): {self.invalid_count}</p>
                 </div>
                 <pre>{structure_output}</pre>
             </body>
@@ -473,8 +1010,8 @@ class FolderStructureTool(tk.Tk):
                 "folder_structure": structure_output.splitlines(),
                 "analysis": {
                     "max_path_length": self.max_path_length,
-                    "long_paths_count": len(self.long_paths),
-                    "invalid_paths_count": len(self.invalid_paths),
+                    "long_paths_count": self.long_count,
+                    "invalid_paths_count": self.invalid_count,
                     "generated_date": datetime.now().isoformat()
                 }
             }
@@ -0,0 +1,101 @@
+"""
+Compare recursive and explicit-stack traversal on deep and wide trees.
+
+The deep tree is a single chain of directories deeper than Python's
+recursion limit; the wide tree has many small directories. Run from the
+Code directory:
+
+    python benchmarks/bench_deep.py --depth 1500 --dirs 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_display import Scanner  # noqa: E402
+
+
+def listdir_structure(path):
+    """The original recursive os.listdir + os.path.isdir traversal"""
+    structure = {}
+    for item in os.listdir(path):
+        if item.startswith('.'):
+            continue
+        full_path = os.path.join(path, item)
+        structure[item] = listdir_structure(full_path) if os.path.isdir(full_path) else None
+    return structure
+
+
+def recursive_structure(path):
+    """Recursive scandir traversal, one Python frame per directory level"""
+    structure = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            structure[entry.name] = recursive_structure(entry.path) if entry.is_dir() else None
+    return structure
+
+
+def build_chain(root, depth):
+    """Create a chain of `depth` nested single-letter directories"""
+    path = root
+    for _ in range(depth):
+        path = os.path.join(path, 'd')
+        os.mkdir(path)
+
+
+def remove_chain(root, depth):
+    """Remove a chain made by build_chain, deepest directory first"""
+    path = os.path.join(root, *(['d'] * depth))
+    while path != root:
+        os.rmdir(path)
+        path = os.path.dirname(path)
+
+
+def build_wide(root, dirs):
+    """Create `dirs` directories spread over a three-level fan-out"""
+    for d in range(dirs):
+        os.makedirs(os.path.join(root, str(d % 50), str(d % 2000), str(d)), exist_ok=True)
+
+
+def timed(func, path):
+    start = time.perf_counter()
+    try:
+        func(path)
+    except RecursionError:
+        return "RecursionError"
+    return f"{(time.perf_counter() - start) * 1000:.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=1500)
+    parser.add_argument('--dirs', type=int, default=100000)
+    args = parser.parse_args()
+
+    scanners = [
+        ("listdir", listdir_structure),
+        ("recursive", recursive_structure),
+        ("stack", Scanner(follow_symlinks=False).scan),
+        ("stack+loop", Scanner(follow_symlinks=True).scan),
+    ]
+    with tempfile.TemporaryDirectory() as root:
+        build_chain(root, args.depth)
+        print(f"chain of {args.depth} directories")
+        for label, func in scanners:
+            print(f"  {label:<12} {timed(func, root)}")
+        remove_chain(root, args.depth)
+    with tempfile.TemporaryDirectory() as root:
+        build_wide(root, args.dirs)
+        print(f"{args.dirs} directories")
+        for label, func in scanners:
+            print(f"  {label:<12} {timed(func, root)}")
+
+
+if __name__ == '__main__':
+    main()
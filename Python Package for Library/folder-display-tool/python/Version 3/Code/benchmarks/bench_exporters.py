@@ -0,0 +1,109 @@
+"""
+Time the streaming exporters against the old string-concatenating ones.
+
+Builds an in-memory structure (no filesystem access) and exports it to a
+temporary file, reporting wall time and the tracemalloc peak of each
+exporter. Run from the Code directory:
+
+    python benchmarks/bench_exporters.py --fanout 10 --depth 6
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_display import HTMLExporter, JSONExporter, TextExporter  # noqa: E402
+
+
+def legacy_html(structure):
+    html = "<ul>"
+    for name, contents in structure.items():
+        html += f"<li>{name}"
+        if contents:
+            html += legacy_html(contents)
+        html += "</li>"
+    html += "</ul>"
+    return html
+
+
+def legacy_text(structure, level=0):
+    text = ""
+    indent = "    " * level
+    for name, contents in structure.items():
+        text += f"{indent}├── {name}\n"
+        if contents:
+            text += legacy_text(contents, level + 1)
+    return text
+
+
+def legacy_html_export(structure, output_file):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(HTMLExporter.HEADER + legacy_html(structure) + HTMLExporter.FOOTER)
+
+
+def legacy_json_export(structure, output_file):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(structure, f, indent=2)
+
+
+def legacy_text_export(structure, output_file):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(legacy_text(structure))
+
+
+def build_structure(fanout, depth):
+    """Build a structure with `fanout` folders and files per level"""
+    def level(remaining):
+        node = {f"file_{i}.txt": None for i in range(fanout)}
+        if remaining:
+            for i in range(fanout):
+                node[f"folder_{i}"] = level(remaining - 1)
+        return node
+    return level(depth - 1)
+
+
+def count_nodes(structure):
+    return sum(1 + (count_nodes(c) if c else 0) for c in structure.values())
+
+
+def measure(label, export, structure, output_file):
+    start = time.perf_counter()
+    export(structure, output_file)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    export(structure, output_file)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = os.path.getsize(output_file)
+    print(f"  {label:<10} {elapsed * 1000:9.1f} ms   peak {peak / 2**20:8.1f} MiB   output {size / 2**20:7.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=6)
+    args = parser.parse_args()
+
+    structure = build_structure(args.fanout, args.depth)
+    print(f"{count_nodes(structure)} nodes")
+    pairs = [
+        ("html", legacy_html_export, HTMLExporter.export),
+        ("json", legacy_json_export, JSONExporter.export),
+        ("text", legacy_text_export, TextExporter.export),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "out")
+        for name, legacy, streaming in pairs:
+            print(name)
+            measure("legacy", legacy, structure, output_file)
+            measure("streaming", streaming, structure, output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare the memory held by a nested-dict structure and a CompactTree.
+
+Builds a synthetic structure in memory (or scans --path) and reports the
+bytes each representation keeps alive, measured with tracemalloc. Run
+from the Code directory:
+
+    python benchmarks/bench_memory.py --fanout 10 --depth 6
+    python benchmarks/bench_memory.py --path /usr
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_display import CompactTree, FolderDisplay  # noqa: E402
+
+
+def build_structure(fanout, depth):
+    """Build a structure with `fanout` folders and files per level"""
+    def level(remaining):
+        node = {f"file_{i}.txt": None for i in range(fanout)}
+        if remaining:
+            for i in range(fanout):
+                node[f"folder_{i}"] = level(remaining - 1)
+        return node
+    return level(depth - 1)
+
+
+def retained(build):
+    """Return (result, bytes still allocated after build, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def report(label, size, elapsed, entries):
+    print(f"  {label:<8} {size / 2**20:9.1f} MiB   {size / entries:7.1f} B/entry   {elapsed:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--path', help="scan an existing folder instead of a synthetic structure")
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=6)
+    args = parser.parse_args()
+
+    if args.path:
+        fd = FolderDisplay()
+        structure, dict_size, dict_time = retained(lambda: fd.get_structure(args.path))
+        fd.set_compact(True)
+        tree, compact_size, compact_time = retained(lambda: fd.get_structure(args.path).tree)
+    else:
+        structure, dict_size, dict_time = retained(lambda: build_structure(args.fanout, args.depth))
+        tree, compact_size, compact_time = retained(lambda: CompactTree.from_structure(structure))
+    entries = len(tree) - 1
+    print(f"{entries} entries")
+    report("dict", dict_size, dict_time, entries)
+    report("compact", compact_size, compact_time, entries)
+    print(f"  reduction x{dict_size / compact_size:.1f}")
+
+
+if __name__ == '__main__':
+    main()
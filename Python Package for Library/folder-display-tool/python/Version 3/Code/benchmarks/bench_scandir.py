@@ -0,0 +1,100 @@
+"""
+Compare the listdir + isdir traversal with the scandir-based Scanner.
+
+Counts the os-level calls each approach makes and times both on a
+synthetic tree. Run from the Code directory:
+
+    python benchmarks/bench_scandir.py --dirs 200 --files 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_display import Scanner  # noqa: E402
+
+
+def legacy_structure(path):
+    """The original os.listdir + os.path.isdir traversal"""
+    structure = {}
+    for item in os.listdir(path):
+        if item.startswith('.'):
+            continue
+        full_path = os.path.join(path, item)
+        if os.path.isdir(full_path):
+            structure[item] = legacy_structure(full_path)
+        else:
+            structure[item] = None
+    return structure
+
+
+def build_tree(root, dirs, files):
+    """Create `dirs` directories of `files` empty files each, two levels deep"""
+    for d in range(dirs):
+        sub = os.path.join(root, f"group_{d % 10}", f"dir_{d}")
+        os.makedirs(sub, exist_ok=True)
+        for f in range(files):
+            open(os.path.join(sub, f"file_{f}.txt"), 'w').close()
+
+
+class CallCounter:
+    """Wrap os functions and count how often they are called"""
+
+    NAMES = ('stat', 'lstat', 'listdir', 'scandir')
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.NAMES, 0)
+        self._originals = {}
+
+    def __enter__(self):
+        for name in self.NAMES:
+            original = getattr(os, name)
+            self._originals[name] = original
+            setattr(os, name, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+
+    def _wrap(self, name, original):
+        def wrapper(*args, **kwargs):
+            self.counts[name] += 1
+            return original(*args, **kwargs)
+        return wrapper
+
+
+def measure(label, func, path, repeat):
+    with CallCounter() as counter:
+        result = func(path)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+    calls = ", ".join(f"{name}={count}" for name, count in counter.counts.items())
+    print(f"{label:<10} {best * 1000:9.1f} ms   {calls}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dirs', type=int, default=200)
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.dirs, args.files)
+        print(f"tree: {args.dirs} dirs x {args.files} files")
+        legacy = measure("listdir", legacy_structure, root, args.repeat)
+        scanned = measure("scandir", Scanner().scan, root, args.repeat)
+        assert legacy == scanned, "scanners disagree"
+
+
+if __name__ == '__main__':
+    main()
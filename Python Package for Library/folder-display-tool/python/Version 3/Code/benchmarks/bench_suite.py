@@ -0,0 +1,297 @@
+"""
+Benchmark the library and the Version 4 GUI on generated trees, saving JSON.
+
+Generates wide, deep, many-tiny-files and huge-single-directory trees
+(under /dev/shm when it exists, so the disk does not dominate) and
+times FolderDisplay.get_structure, display, every exporter, a diff of
+two reloaded binary snapshots and the Version 4 GUI's scan and
+formatting loops on each. Every measurement
+runs in a fresh process so peak RSS belongs to that step alone; each
+result records the best wall time of --repeat runs, entries per second,
+peak RSS and the tracemalloc peak of one extra traced run. Run from the
+Code directory:
+
+    python benchmarks/bench_suite.py --entries 100000 --output before.json
+    python benchmarks/bench_suite.py --entries 100000 --output after.json --compare before.json
+"""
+
+import argparse
+import glob
+import importlib.util
+import io
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CODE_DIR)
+
+from folder_display import (FolderDisplay, HTMLExporter, JSONExporter,  # noqa: E402
+                            NDJSONExporter, Snapshot, TextExporter, iter_structure)
+
+GUI_SCRIPT = os.path.normpath(os.path.join(CODE_DIR, *[os.pardir] * 5, 'GUI Applications',
+                                           'Version 4', 'Code', 'show-folder-content.py'))
+
+SHAPES = ('wide', 'deep', 'tiny', 'huge-dir')
+BENCHES = ('get_structure', 'display', 'export_html', 'export_json', 'export_text',
+           'export_ndjson', 'diff_loaded', 'gui_scan', 'gui_render')
+
+
+def generate(root, shape, entries):
+    """Create a tree of roughly `entries` entries of one shape under root"""
+    os.makedirs(root)
+    if shape == 'wide':
+        # Many folders side by side, 49 files each
+        for d in range(max(1, entries // 50)):
+            folder = os.path.join(root, f"folder_{d}")
+            os.mkdir(folder)
+            for f in range(49):
+                open(os.path.join(folder, f"file_{f}.txt"), 'w').close()
+    elif shape == 'deep':
+        # Chains 100 folders deep, four files per level
+        for c in range(max(1, entries // 500)):
+            folder = os.path.join(root, f"chain_{c}")
+            for level in range(100):
+                os.mkdir(folder)
+                for f in range(4):
+                    open(os.path.join(folder, f"file_{f}.txt"), 'w').close()
+                folder = os.path.join(folder, f"level_{level}")
+    elif shape == 'tiny':
+        # Folders of ten, each file holding a few bytes
+        def fill(folder, remaining):
+            for f in range(min(10, remaining)):
+                with open(os.path.join(folder, f"tiny_{f}.dat"), 'w') as out:
+                    out.write('x' * (f + 1))
+            remaining -= min(10, remaining)
+            d = 0
+            while remaining > 0 and d < 10:
+                child = os.path.join(folder, f"dir_{d}")
+                os.mkdir(child)
+                share = remaining // (10 - d)
+                fill(child, share - 1)
+                remaining -= share
+                d += 1
+        fill(root, entries)
+    elif shape == 'huge-dir':
+        for f in range(entries):
+            open(os.path.join(root, f"entry_{f:08d}.log"), 'w').close()
+    else:
+        raise ValueError(f"unknown shape {shape!r}")
+
+
+def count_entries(root):
+    return sum(1 for _ in iter_structure(FolderDisplay().get_structure(root), root))
+
+
+class _Value:
+    """Stands in for a Tk variable"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def load_gui(script):
+    """Build a headless FolderStructureTool (no window) from the GUI script"""
+    spec = importlib.util.spec_from_file_location('show_folder_content', script)
+    gui = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gui)
+    tool = gui.FolderStructureTool.__new__(gui.FolderStructureTool)
+    tool.tk = None
+    tool.is_windows = False
+    tool.windows_path_limit = 260
+    tool.offender_spool = None
+    tool.show_path_lengths_var = _Value(True)
+    tool.truncate_names_var = _Value(True)
+    return gui, tool
+
+
+def gui_scan(gui, tool, root):
+    """Run the GUI's scan worker and collect its model, as the UI thread does"""
+    tool.reset_path_analysis()
+    tool.scan_profile = tool.new_scan_profile()
+    options = {"include_hidden": False, "exclude_filter": gui.PathFilter(), "profile": tool.scan_profile}
+    scan_queue = queue.Queue()
+    tool.scan_worker(root, options, scan_queue, threading.Event())
+    model = []
+    while True:
+        kind, payload = scan_queue.get_nowait()
+        if kind != "entries":
+            break
+        entries, long_paths = payload
+        tool.record_scan_batch(entries, long_paths)
+        model.extend(entries)
+    return model
+
+
+def make_step(bench, root, gui_script):
+    """Return (setup, step): setup runs untimed, step(state) is what gets measured"""
+    fd = FolderDisplay()
+    exporters = {'export_html': HTMLExporter, 'export_json': JSONExporter,
+                 'export_text': TextExporter, 'export_ndjson': NDJSONExporter}
+    if bench == 'get_structure':
+        return lambda: None, lambda _: fd.get_structure(root)
+    if bench == 'display':
+        return lambda: None, lambda _: fd.display(root)
+    if bench in exporters:
+        exporter = exporters[bench]
+        # Exporters render an already scanned structure, so only the export is timed
+        return lambda: fd.get_structure(root), lambda structure: exporter.export(structure, io.StringIO())
+    if bench == 'diff_loaded':
+        # Without stamps every folder is compared, through the CompactTree views of the files
+        def setup():
+            snapshot = fd.snapshot(root)
+            files = (root + '.old.fdsnap', root + '.new.fdsnap')
+            for snapshot_file in files:
+                snapshot.save(snapshot_file)
+            return files
+        return setup, lambda files: Snapshot.load(files[0]).diff(Snapshot.load(files[1]))
+    if bench == 'gui_scan':
+        return lambda: load_gui(gui_script), lambda state: gui_scan(state[0], state[1], root)
+    if bench == 'gui_render':
+        def setup():
+            gui, tool = load_gui(gui_script)
+            return tool, gui_scan(gui, tool, root)
+        return setup, lambda state: state[0].render_entries(state[1])
+    raise ValueError(f"unknown benchmark {bench!r}")
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_one(bench, root, entries, repeat, gui_script):
+    """Measure one benchmark on one tree (called in a child process)"""
+    try:
+        setup, step = make_step(bench, root, gui_script)
+        state = setup()
+    except (ImportError, OSError) as e:
+        # No tkinter or pyperclip here, or the GUI script is elsewhere (see --gui)
+        return {'skipped': f"{type(e).__name__}: {e}"}
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        step(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    rss = peak_rss()
+    tracemalloc.start()
+    step(state)
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'wall_s': best,
+        'entries_per_s': entries / best if best else None,
+        'peak_rss_bytes': rss,
+        'tracemalloc_peak_bytes': traced_peak,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=CODE_DIR,
+                                       stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file):
+    """Print each result's wall time against the same measurement in a baseline"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = {(r['shape'], r['bench']): r for r in json.load(f)['results']}
+    print(f"\nagainst {baseline_file} (ratio > 1 is slower)")
+    for result in results:
+        old = baseline.get((result['shape'], result['bench']))
+        if old and old.get('wall_s') and result.get('wall_s'):
+            print(f"  {result['shape']:<9} {result['bench']:<14} x{result['wall_s'] / old['wall_s']:5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=50000, help="approximate entries per tree")
+    parser.add_argument('--shapes', nargs='+', choices=SHAPES, default=list(SHAPES))
+    parser.add_argument('--benches', nargs='+', choices=BENCHES, default=list(BENCHES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--root', help="where to generate trees (default: /dev/shm or the temp folder)")
+    parser.add_argument('--gui', default=GUI_SCRIPT, help="path of the Version 4 GUI script")
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help="earlier --output file to compare with")
+    parser.add_argument('--run-one', nargs=3, metavar=('BENCH', 'TREE', 'ENTRIES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        bench, root, entries = args.run_one
+        print(json.dumps(run_one(bench, root, int(entries), args.repeat, args.gui)))
+        return
+
+    base = args.root or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+    workdir = tempfile.mkdtemp(prefix='folder-display-bench-', dir=base)
+    results = []
+    try:
+        for shape in args.shapes:
+            root = os.path.join(workdir, shape)
+            generate(root, shape, args.entries)
+            entries = count_entries(root)
+            print(f"{shape}: {entries} entries")
+            for bench in args.benches:
+                output = subprocess.check_output(
+                    [sys.executable, os.path.abspath(__file__), '--repeat', str(args.repeat),
+                     '--gui', args.gui, '--run-one', bench, root, str(entries)],
+                    universal_newlines=True)
+                result = dict(shape=shape, bench=bench, entries=entries, **json.loads(output))
+                results.append(result)
+                if 'skipped' in result:
+                    print(f"  {bench:<14} skipped ({result['skipped']})")
+                else:
+                    rss = result['peak_rss_bytes']
+                    print(f"  {bench:<14} {result['wall_s'] * 1000:9.1f} ms  "
+                          f"{result['entries_per_s']:12.0f} entries/s  "
+                          f"rss {rss / 2**20 if rss else float('nan'):7.1f} MiB  "
+                          f"traced {result['tracemalloc_peak_bytes'] / 2**20:7.1f} MiB")
+            shutil.rmtree(root)
+            for snapshot_file in glob.glob(root + '.*.fdsnap'):
+                os.remove(snapshot_file)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'tree_root': base or tempfile.gettempdir(),
+            'entries': args.entries,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"saved {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
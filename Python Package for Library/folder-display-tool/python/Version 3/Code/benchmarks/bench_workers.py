@@ -0,0 +1,67 @@
+"""
+Time FolderDisplay.get_structure with different thread or process counts.
+
+Without --path a synthetic tree is built in a temporary directory; local
+disks show little gain, so point --path at an NFS or FUSE mount to see
+the effect of overlapping directory reads. Run from the Code directory:
+
+    python benchmarks/bench_workers.py --path /mnt/nfs/build --workers 1 4 16 32
+    python benchmarks/bench_workers.py --processes --workers 1 8 32 64
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from folder_display import FolderDisplay  # noqa: E402
+
+
+def build_tree(root, dirs, files):
+    """Create `dirs` directories of `files` empty files each"""
+    for d in range(dirs):
+        sub = os.path.join(root, f"group_{d % 20}", f"dir_{d}")
+        os.makedirs(sub, exist_ok=True)
+        for f in range(files):
+            open(os.path.join(sub, f"file_{f}.txt"), 'w').close()
+
+
+def run(path, worker_counts, repeat, use_processes):
+    reference = None
+    baseline = None
+    for workers in worker_counts:
+        fd = FolderDisplay(workers=workers, use_processes=use_processes)
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            structure = fd.get_structure(path)
+            best = min(best, time.perf_counter() - start)
+        if reference is None:
+            reference, baseline = structure, best
+        assert structure == reference, f"workers={workers} changed the result"
+        print(f"workers={workers:<4} {best * 1000:9.1f} ms   speedup x{baseline / best:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--path', help="scan an existing folder instead of a synthetic tree")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--processes', action='store_true', help="shard across processes instead of threads")
+    parser.add_argument('--dirs', type=int, default=2000)
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.path:
+        run(args.path, args.workers, args.repeat, args.processes)
+        return
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.dirs, args.files)
+        run(root, args.workers, args.repeat, args.processes)
+
+
+if __name__ == '__main__':
+    main()
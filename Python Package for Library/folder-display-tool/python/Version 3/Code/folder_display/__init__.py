@@ -2,10 +2,54 @@
 Folder Display - A Python library for displaying and managing folder structures
 """
 
-from .folder_display import FolderDisplay
-from .exporters import HTMLExporter, JSONExporter, TextExporter
+from importlib import import_module
 
 __version__ = "1.0.0"
 __author__ = "Arjun Mehta"
 
-__all__ = ['FolderDisplay', 'HTMLExporter', 'JSONExporter', 'TextExporter'] 
\ No newline at end of file
+__all__ = [
+    'FolderDisplay', 'Snapshot', 'HTMLExporter', 'JSONExporter', 'TextExporter',
+    'NDJSONExporter',
+    'Scanner', 'ThreadedScanner', 'ProcessScanner', 'Entry', 'iter_structure',
+    'CompactTree', 'CompactNode', 'scan_compact', 'ScanCache',
+    'Watcher', 'Change', 'PathAnalyzer', 'NameIndex', 'PathFilter',
+    'TruncatedDir', 'LazyNode', 'DiskUsage', 'Usage', 'format_size',
+    'DuplicateFinder', 'Duplicates', 'DuplicateGroup', 'DiffEntry', 'diff_structures',
+    'ScanStats', 'DirStats',
+]
+
+# Public names and the submodule defining each. They are imported on first
+# access, so `import folder_display` (and the command line tool) only loads
+# the modules a caller actually uses.
+_EXPORTS = {
+    'FolderDisplay': 'folder_display',
+    'PathAnalyzer': 'analysis',
+    'ScanCache': 'cache',
+    'CompactNode': 'compact', 'CompactTree': 'compact', 'scan_compact': 'compact',
+    'DiffEntry': 'diff', 'diff_structures': 'diff',
+    'DuplicateFinder': 'duplicates', 'DuplicateGroup': 'duplicates', 'Duplicates': 'duplicates',
+    'PathFilter': 'exclude',
+    'HTMLExporter': 'exporters', 'JSONExporter': 'exporters',
+    'NDJSONExporter': 'exporters', 'TextExporter': 'exporters',
+    'NameIndex': 'index',
+    'ProcessScanner': 'parallel', 'ThreadedScanner': 'parallel',
+    'LazyNode': 'lazy',
+    'Entry': 'scanner', 'Scanner': 'scanner', 'TruncatedDir': 'scanner', 'iter_structure': 'scanner',
+    'Snapshot': 'snapshot',
+    'DirStats': 'stats', 'ScanStats': 'stats',
+    'DiskUsage': 'usage', 'Usage': 'usage', 'format_size': 'usage',
+    'Change': 'watch', 'Watcher': 'watch',
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,139 @@
+import heapq
+import os
+from itertools import count
+from typing import Dict, IO, Iterable, List, Optional, Tuple
+
+from .exporters import Output
+from .scanner import Entry
+
+# Length of the separator added between a folder's path and a child's name
+_SEP_LENGTH = len(os.sep)
+
+
+class PathAnalyzer:
+    """Streaming path-length statistics with bounded memory.
+
+    Paths are fed one at a time, usually as a parent length plus a name,
+    so no path has to be built or made absolute just to measure it.
+    The analyzer keeps running totals, a histogram of lengths in buckets
+    of ``bucket_size`` characters and a heap of the ``top_k`` longest
+    paths; memory does not grow with the number of entries.
+
+    ``total`` counts every path recorded; after add_entries that is the
+    entries plus the scanned folder itself, whose path is checked too.
+
+    Paths over ``long_limit`` count as long and paths over
+    ``invalid_limit`` as invalid (pass None to disable the check, e.g.
+    off Windows). Pass ``offenders`` (a path or text writable) to also
+    stream every long or invalid path to disk as ``length<TAB>path``
+    lines; close() the analyzer afterwards when a path was given.
+    """
+
+    def __init__(self, long_limit: int = 200, invalid_limit: Optional[int] = 260,
+                 top_k: int = 100, bucket_size: int = 10,
+                 offenders: Optional[Output] = None):
+        self.long_limit = long_limit
+        self.invalid_limit = invalid_limit
+        self.top_k = top_k
+        self.bucket_size = bucket_size
+        self.total = 0
+        self.max_length = 0
+        self.long_count = 0
+        self.invalid_count = 0
+        self.histogram: Dict[int, int] = {}
+        self._heap: List[Tuple[int, int, str]] = []
+        self._order = count()
+        self._owns_offenders = isinstance(offenders, str)
+        self._offenders: Optional[IO[str]] = (
+            open(offenders, 'w', encoding='utf-8') if self._owns_offenders else offenders)
+
+    def __enter__(self) -> 'PathAnalyzer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def category(self, length: int) -> str:
+        """Get 'invalid', 'long' or 'normal' for a path length"""
+        if self.invalid_limit is not None and length > self.invalid_limit:
+            return 'invalid'
+        if length > self.long_limit:
+            return 'long'
+        return 'normal'
+
+    def add(self, path: str, length: Optional[int] = None) -> int:
+        """Record one path and return its length (len(path) unless given)"""
+        if length is None:
+            length = len(path)
+        self.total += 1
+        if length > self.max_length:
+            self.max_length = length
+        bucket = length - length % self.bucket_size
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        if length > self.long_limit:
+            self.long_count += 1
+            if self.invalid_limit is not None and length > self.invalid_limit:
+                self.invalid_count += 1
+            if self._offenders is not None:
+                self._offenders.write(f"{length}\t{path}\n")
+        if self.top_k > 0:
+            # The order counter breaks ties so paths are never compared
+            if len(self._heap) < self.top_k:
+                heapq.heappush(self._heap, (length, next(self._order), path))
+            elif length > self._heap[0][0]:
+                heapq.heapreplace(self._heap, (length, next(self._order), path))
+        return length
+
+    def add_child(self, parent_path: str, parent_length: int, name: str) -> int:
+        """Record an entry of a folder whose path length is already known"""
+        return self.add(os.path.join(parent_path, name), parent_length + _SEP_LENGTH + len(name))
+
+    def add_entries(self, entries: Iterable[Entry], root: str) -> None:
+        """Record the scanned folder and every entry of a depth-first scan stream.
+
+        Lengths are those of the absolute paths, and the absolute paths are
+        what longest() and the offender file report.
+        """
+        absolute = os.path.abspath(root)
+        # dir_lengths[depth] is the length of the folder holding entries at that depth
+        dir_lengths = [self.add(absolute)]
+        if absolute == root:
+            for entry in entries:
+                del dir_lengths[entry.depth + 1:]
+                length = self.add(entry.path, dir_lengths[entry.depth] + _SEP_LENGTH + len(entry.name))
+                if entry.is_dir:
+                    dir_lengths.append(length)
+            return
+        # Relative or unnormalised root: rebuild each path under the absolute one
+        dir_paths = [absolute]
+        for entry in entries:
+            del dir_lengths[entry.depth + 1:]
+            del dir_paths[entry.depth + 1:]
+            path = os.path.join(dir_paths[entry.depth], entry.name)
+            length = self.add(path, dir_lengths[entry.depth] + _SEP_LENGTH + len(entry.name))
+            if entry.is_dir:
+                dir_lengths.append(length)
+                dir_paths.append(path)
+
+    def longest(self) -> List[Tuple[str, int]]:
+        """Get the top_k longest paths as (path, length), longest first"""
+        return [(path, length) for length, _, path in sorted(self._heap, reverse=True)]
+
+    def report(self) -> Dict:
+        """Get the statistics as a JSON-serialisable dictionary"""
+        return {
+            'total': self.total,
+            'max_length': self.max_length,
+            'long_limit': self.long_limit,
+            'invalid_limit': self.invalid_limit,
+            'long_count': self.long_count,
+            'invalid_count': self.invalid_count,
+            'histogram': {str(bucket): n for bucket, n in sorted(self.histogram.items())},
+            'longest': [{'path': path, 'length': length} for path, length in self.longest()],
+        }
+
+    def close(self) -> None:
+        """Close the offender file if the analyzer opened it"""
+        if self._owns_offenders and self._offenders is not None:
+            self._offenders.close()
+            self._offenders = None
@@ -0,0 +1,112 @@
+import json
+import lzma
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Optional, Tuple
+
+from .compact import CompactTree
+from .diff import StampColumns
+
+# File layout: a fixed header, then the payload (compressed as a whole if
+# asked) holding the metadata JSON, the CompactTree columns and, when the
+# header's stamps flag is set, the three 8-byte StampColumns columns in
+# folder order. Name offsets are 8-byte items when the header's wide names
+# flag is set and 4-byte ones otherwise. Each section starts on a boundary
+# of its item size so it can be used in place.
+MAGIC = b'FDSNAP\x00\x01'
+_HEADER = struct.Struct('<8sBBBB4xQQQQ')
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+COMPRESSIONS = {None: 0, 'zlib': 1, 'lzma': 2}
+
+
+def _pad(length: int, size: int = 4) -> int:
+    return -length % size
+
+
+def write_tree(tree: CompactTree, meta: Dict, output_file: str, compress: Optional[str] = None,
+               stamps: Optional[StampColumns] = None) -> None:
+    """Write a CompactTree, its JSON-serializable metadata and optionally its folder stamps.
+
+    compress is None (the file can then be memory-mapped), 'zlib' or 'lzma'.
+    """
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"unknown compression {compress!r}, expected one of {tuple(COMPRESSIONS)}")
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    sections = [meta_bytes, tree.flags, tree.name_end, tree.dir_index, tree.dir_child_start, tree.names]
+    payload = bytearray()
+    if stamps is not None:
+        sections += [array('q', stamps.mtime), array('q', stamps.newest), array('q', stamps.count)]
+    for section in sections:
+        # Columns of 8-byte items are 8-byte aligned, everything else 4-byte aligned
+        payload += b'\0' * _pad(len(payload), 8 if getattr(section, 'itemsize', 1) == 8 else 4)
+        payload += section if isinstance(section, (bytes, bytearray)) else section.tobytes()
+    if compress == 'zlib':
+        payload = zlib.compress(payload, 6)
+    elif compress == 'lzma':
+        payload = lzma.compress(payload)
+    header = _HEADER.pack(MAGIC, _BYTE_ORDERS[sys.byteorder], COMPRESSIONS[compress],
+                          stamps is not None, tree.name_end.itemsize == 8,
+                          len(meta_bytes), len(tree.flags), len(tree.dir_index), len(tree.names))
+    with open(output_file, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+
+
+def _column(buffer: memoryview, start: int, count: int, typecode: str, swap: bool):
+    """View count items of a column in place, or copy them when the byte order differs"""
+    size = array(typecode).itemsize
+    view = buffer[start:start + count * size]
+    if not swap:
+        return view.cast(typecode)
+    column = array(typecode)
+    column.frombytes(view)
+    column.byteswap()
+    return column
+
+
+def read_tree(input_file: str) -> Tuple[CompactTree, Dict, Optional[StampColumns]]:
+    """Load a file written by write_tree, returning the tree, its metadata and its stamps.
+
+    An uncompressed file is memory-mapped and the tree's columns are
+    views into the mapping, so loading reads only the header and the
+    metadata; the pages holding a subtree are read when it is visited.
+    A compressed file is decompressed into memory first. The tree is
+    read-only. Stamps are None when none were written.
+    """
+    with open(input_file, 'rb') as f:
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size or not head.startswith(MAGIC):
+            raise ValueError(f"{input_file} is not a folder_display snapshot")
+        (magic, byte_order, compression, has_stamps, wide_names,
+         meta_len, entries, dirs, names_len) = _HEADER.unpack(head)
+        if compression == COMPRESSIONS[None]:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))[_HEADER.size:]
+        elif compression == COMPRESSIONS['zlib']:
+            buffer = memoryview(zlib.decompress(f.read()))
+        elif compression == COMPRESSIONS['lzma']:
+            buffer = memoryview(lzma.decompress(f.read()))
+        else:
+            raise ValueError(f"{input_file} uses an unknown compression ({compression})")
+    swap = byte_order != _BYTE_ORDERS[sys.byteorder]
+    meta = json.loads(str(buffer[:meta_len], 'utf-8'))
+    offset = meta_len
+    tree = CompactTree(meta.get('path', ''))
+    for attr, count, typecode in (('flags', entries, 'B'), ('name_end', entries, 'Q' if wide_names else 'I'),
+                                  ('dir_index', dirs, 'I'), ('dir_child_start', dirs, 'I')):
+        offset += _pad(offset, 8 if typecode == 'Q' else 4)
+        setattr(tree, attr, _column(buffer, offset, count, typecode, swap))
+        offset += count * array(typecode).itemsize
+    offset += _pad(offset)
+    tree.names = buffer[offset:offset + names_len]
+    if not has_stamps:
+        return tree, meta, None
+    offset += names_len
+    columns = []
+    for _ in range(3):
+        offset += _pad(offset, 8)
+        columns.append(_column(buffer, offset, dirs, 'q', swap))
+        offset += dirs * 8
+    return tree, meta, StampColumns(tree, *columns)
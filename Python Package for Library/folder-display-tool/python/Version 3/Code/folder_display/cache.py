@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Directory listing as stored in the cache: (name, is_dir) pairs
+Listing = List[Tuple[str, bool]]
+
+# Listings of directories modified this recently are not cached, since a
+# change within the same mtime tick would otherwise go unnoticed
+_SETTLE_NS = 2 * 10**9
+
+
+class ScanCache:
+    """LRU cache of directory listings, validated by directory mtime.
+
+    A listing is reused while the directory's (st_mtime_ns, st_ino) is
+    unchanged, so a re-scan only reads directories that gained, lost or
+    renamed entries. Changes that do not touch the directory itself, such
+    as a symlink retargeted in place, are not detected.
+
+    Pass a path to persist the cache between runs with load() and save().
+    The file is a pickle, so keep it somewhere only you can write.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._listings: 'OrderedDict[Tuple[str, bool], Tuple[int, int, Tuple[str, ...], bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def lookup(self, dir_path: str, follow_symlinks: bool, st: os.stat_result) -> Optional[Listing]:
+        """Get the cached listing of a directory if it has not changed since"""
+        key = (dir_path, follow_symlinks)
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_ino:
+                self.misses += 1
+                return None
+            self._listings.move_to_end(key)
+            self.hits += 1
+        names, dirs = cached[2], cached[3]
+        return [(name, bool(is_dir)) for name, is_dir in zip(names, dirs)]
+
+    def store(self, dir_path: str, follow_symlinks: bool, st: os.stat_result, listing: Listing) -> None:
+        """Remember a directory listing, evicting the least recently used ones"""
+        if time.time() * 1e9 - st.st_mtime_ns < _SETTLE_NS:
+            return
+        names = tuple(name for name, _ in listing)
+        dirs = bytes(is_dir for _, is_dir in listing)
+        key = (dir_path, follow_symlinks)
+        with self._lock:
+            self._listings[key] = (st.st_mtime_ns, st.st_ino, names, dirs)
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.max_entries:
+                self._listings.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached listing"""
+        with self._lock:
+            self._listings.clear()
+
+    def reset_stats(self) -> None:
+        """Zero the hit, miss and eviction counters"""
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss and eviction counts and the number of cached listings"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._listings),
+        }
+
+    def load(self, path: Optional[str] = None) -> None:
+        """Replace the cache contents with a file written by save()"""
+        import pickle
+        with open(path or self.path, 'rb') as f:
+            listings = pickle.load(f)
+        with self._lock:
+            self._listings = OrderedDict(listings)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the cache to a file, replacing it atomically"""
+        target = path or self.path
+        tmp = target + '.tmp'
+        with self._lock:
+            listings = list(self._listings.items())
+        import pickle
+        with open(tmp, 'wb') as f:
+            pickle.dump(listings, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
@@ -0,0 +1,188 @@
+"""
+Command line interface: folder-display scan|display|export|analyze|search PATH
+
+Every command writes to stdout as the scan goes, so output can be piped
+into other tools on large trees. Only the modules a command needs are
+imported, and only once it runs, so the tool starts quickly.
+"""
+
+import argparse
+import os
+import re
+import sys
+from typing import Iterable, List, Optional
+
+# Lines written to stdout at once
+BATCH_SIZE = 2048
+
+EXPORT_FORMATS = ('text', 'html', 'json', 'ndjson')
+SEARCH_MODES = ('substring', 'glob', 'regex')
+
+
+def _write_lines(lines: Iterable[str]) -> None:
+    """Write lines to stdout, BATCH_SIZE at a time"""
+    write = sys.stdout.write
+    parts = []
+    for line in lines:
+        parts.append(line)
+        if len(parts) >= BATCH_SIZE:
+            parts.append("")
+            write("\n".join(parts))
+            parts.clear()
+    if parts:
+        parts.append("")
+        write("\n".join(parts))
+
+
+def _folder_display(args: argparse.Namespace):
+    """Build a FolderDisplay from the scan options shared by every command"""
+    from .folder_display import FolderDisplay
+    fd = FolderDisplay()
+    fd.set_include_hidden(args.hidden)
+    fd.set_excluded_folders(args.exclude_folder)
+    fd.set_exclude_patterns(args.exclude)
+    fd.set_read_gitignore(args.gitignore)
+    fd.set_follow_symlinks(not args.no_follow)
+    fd.set_same_filesystem(args.one_file_system)
+    fd.set_max_depth(args.max_depth)
+    fd.set_ignore_errors(args.ignore_errors)
+    return fd
+
+
+def cmd_scan(args: argparse.Namespace) -> None:
+    fd = _folder_display(args)
+    if args.ndjson:
+        fd.export_ndjson(args.path, sys.stdout, stat=args.stat)
+    else:
+        _write_lines(entry.path for entry in fd.iter_entries(args.path))
+
+
+def cmd_display(args: argparse.Namespace) -> None:
+    fd = _folder_display(args)
+    fd.set_collect_usage(args.usage)
+    _write_lines(fd.iter_display(args.path))
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    fd = _folder_display(args)
+    fd.set_collect_usage(args.usage)
+    output = args.output or sys.stdout
+    if args.format == 'ndjson':
+        fd.export_ndjson(args.path, output, stat=args.stat)
+    else:
+        getattr(fd, 'export_' + args.format)(args.path, output)
+
+
+def cmd_analyze(args: argparse.Namespace) -> None:
+    fd = _folder_display(args)
+    analyzer = fd.analyze_paths(args.path, long_limit=args.long_limit,
+                                invalid_limit=args.invalid_limit or None, top_k=args.top)
+    if args.json:
+        import json
+        json.dump(analyzer.report(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    lines = [f"paths:    {analyzer.total}",
+             f"longest:  {analyzer.max_length}",
+             f"long:     {analyzer.long_count} (over {analyzer.long_limit})"]
+    if analyzer.invalid_limit is not None:
+        lines.append(f"invalid:  {analyzer.invalid_count} (over {analyzer.invalid_limit})")
+    lines.extend(f"{length:8}  {path}" for path, length in analyzer.longest())
+    _write_lines(lines)
+
+
+def cmd_search(args: argparse.Namespace) -> None:
+    index = _folder_display(args).build_index(args.path)
+    _write_lines(index.full_path(entry_id) for entry_id in
+                 index.search_ids(args.query, args.mode, args.case_sensitive, args.limit))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser with one subcommand per operation"""
+    scan_options = argparse.ArgumentParser(add_help=False)
+    scan_options.add_argument('--hidden', action='store_true', help="include hidden files and folders")
+    scan_options.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                              help="skip entries matching a gitignore-style pattern (repeatable)")
+    scan_options.add_argument('--exclude-folder', action='append', default=[], metavar='NAME',
+                              help="skip folders with this exact name (repeatable)")
+    scan_options.add_argument('--gitignore', action='store_true', help="honour .gitignore files")
+    scan_options.add_argument('--ignore-errors', action='store_true',
+                              help="show unreadable folders as empty instead of stopping")
+    scan_options.add_argument('--max-depth', type=int, metavar='N', help="list folders at most N levels deep")
+    scan_options.add_argument('--no-follow', action='store_true', help="do not follow symlinked folders")
+    scan_options.add_argument('--one-file-system', action='store_true',
+                              help="stay on the filesystem of PATH")
+
+    parser = argparse.ArgumentParser(prog='folder-display', description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    scan = subparsers.add_parser('scan', parents=[scan_options], help="list every path, one per line")
+    scan.add_argument('path')
+    scan.add_argument('--ndjson', action='store_true', help="write JSON Lines records instead")
+    scan.add_argument('--stat', action='store_true', help="add size and mtime to --ndjson records")
+    scan.set_defaults(func=cmd_scan)
+
+    display = subparsers.add_parser('display', parents=[scan_options], help="print the indented tree")
+    display.add_argument('path')
+    display.add_argument('--usage', action='store_true', help="show sizes and file counts")
+    display.set_defaults(func=cmd_display)
+
+    export = subparsers.add_parser('export', parents=[scan_options], help="export the tree in a file format")
+    export.add_argument('format', choices=EXPORT_FORMATS)
+    export.add_argument('path')
+    export.add_argument('-o', '--output', metavar='FILE', help="write to FILE instead of stdout")
+    export.add_argument('--usage', action='store_true', help="include sizes (text, html and json)")
+    export.add_argument('--stat', action='store_true', help="add size and mtime to ndjson records")
+    export.set_defaults(func=cmd_export)
+
+    analyze = subparsers.add_parser('analyze', parents=[scan_options], help="report path lengths")
+    analyze.add_argument('path')
+    analyze.add_argument('--long-limit', type=int, default=200, metavar='N')
+    analyze.add_argument('--invalid-limit', type=int, default=260, metavar='N', help="0 to disable")
+    analyze.add_argument('--top', type=int, default=10, metavar='N', help="longest paths to list")
+    analyze.add_argument('--json', action='store_true', help="print the full report as JSON")
+    analyze.set_defaults(func=cmd_analyze)
+
+    search = subparsers.add_parser('search', parents=[scan_options], help="find entries by name")
+    search.add_argument('query')
+    search.add_argument('path')
+    search.add_argument('--mode', choices=SEARCH_MODES, default='substring')
+    search.add_argument('-s', '--case-sensitive', action='store_true')
+    search.add_argument('--limit', type=int, metavar='N')
+    search.set_defaults(func=cmd_search)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line tool, returning the exit status"""
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.path):
+        print(f"folder-display: {args.path}: not a folder", file=sys.stderr)
+        return 2
+    # Names that are not valid UTF-8 are written back as their original bytes
+    sys.stdout.reconfigure(errors='surrogateescape')
+    try:
+        args.func(args)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader (e.g. head) went away; stop without a traceback
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except OSError as e:
+        # e.g. an unreadable folder without --ignore-errors
+        message = f"{e.filename}: {e.strerror}" if e.filename and e.strerror else str(e)
+        print(f"folder-display: {message}", file=sys.stderr)
+        return 2
+    except (re.error, ValueError) as e:
+        # e.g. an invalid --mode regex query
+        print(f"folder-display: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
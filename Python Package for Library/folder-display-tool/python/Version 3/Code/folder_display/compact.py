@@ -0,0 +1,200 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import ItemsView, Mapping
+from typing import Dict, Iterator, Optional
+
+from .scanner import Scanner
+
+# Bit set in CompactTree.flags for folders
+FLAG_DIR = 1
+
+
+class CompactTree:
+    """Folder structure stored as parallel arrays instead of nested dicts.
+
+    Entries are numbered breadth-first from the root (index 0), so the
+    children of every folder occupy a contiguous index range and folders
+    are listed in index order. That lets the tree keep just two columns
+    per entry (flags and the end offset of its UTF-8 name in one shared
+    bytearray) plus two per folder (its index and the index of its first
+    child). Parents and child ranges are found by bisecting the folder
+    columns. An entry costs 5 bytes plus its name, against roughly 100
+    bytes or more as a dict item.
+
+    Name offsets start as 4-byte items and are widened to 8 bytes once
+    the names pass 4 GiB. Entry indexes stay 4 bytes, which limits a tree
+    to 2**32 - 1 entries.
+
+    Use the ``root`` view wherever a structure dictionary is expected.
+    Trees loaded with Snapshot.load keep their columns as read-only
+    views of the snapshot file.
+    """
+
+    def __init__(self, path: str = ''):
+        self.path = path
+        self.flags = array('B', [FLAG_DIR])
+        self.name_end = array('I', [0])
+        self.names = bytearray()
+        self.dir_index = array('I', [0])
+        self.dir_child_start = array('I')
+
+    def __len__(self) -> int:
+        """Number of entries, including the root"""
+        return len(self.flags)
+
+    def _append(self, name: str, is_dir: bool) -> int:
+        """Add an entry to the folder being filled and return its index"""
+        index = len(self.flags)
+        self.names += name.encode('utf-8', 'surrogateescape')
+        try:
+            self.name_end.append(len(self.names))
+        except OverflowError:
+            # Past 4 GiB of names: widen the offsets instead of failing mid-scan
+            self.name_end = array('Q', self.name_end)
+            self.name_end.append(len(self.names))
+        if is_dir:
+            self.flags.append(FLAG_DIR)
+            self.dir_index.append(index)
+        else:
+            self.flags.append(0)
+        return index
+
+    def _start_children(self) -> None:
+        """Mark the next entries as children of the next folder in index order"""
+        self.dir_child_start.append(len(self.flags))
+
+    def name(self, index: int) -> str:
+        """Get the name of an entry"""
+        start = self.name_end[index - 1] if index else 0
+        return str(self.names[start:self.name_end[index]], 'utf-8', 'surrogateescape')
+
+    def is_dir(self, index: int) -> bool:
+        """Check whether an entry is a folder"""
+        return bool(self.flags[index] & FLAG_DIR)
+
+    def children(self, index: int) -> range:
+        """Get the index range of an entry's children"""
+        slot = bisect_left(self.dir_index, index)
+        if slot == len(self.dir_index) or self.dir_index[slot] != index:
+            return range(0)
+        start = self.dir_child_start[slot]
+        if slot + 1 < len(self.dir_child_start):
+            return range(start, self.dir_child_start[slot + 1])
+        return range(start, len(self.flags))
+
+    def parent(self, index: int) -> int:
+        """Get the index of an entry's folder (0 for the root itself)"""
+        if not index:
+            return 0
+        return self.dir_index[bisect_right(self.dir_child_start, index) - 1]
+
+    def full_path(self, index: int) -> str:
+        """Rebuild the path of an entry from its ancestors"""
+        names = []
+        while index:
+            names.append(self.name(index))
+            index = self.parent(index)
+        return os.path.join(self.path, *reversed(names))
+
+    @property
+    def root(self) -> 'CompactNode':
+        """Dictionary-like view of the scanned folder"""
+        return CompactNode(self, 0)
+
+    @classmethod
+    def from_structure(cls, structure: Mapping, path: str = '') -> 'CompactTree':
+        """Build a compact tree from a structure dictionary"""
+        tree = cls(path)
+        queue = deque([structure])
+        while queue:
+            node = queue.popleft()
+            tree._start_children()
+            for name, contents in node.items():
+                tree._append(name, contents is not None)
+                if contents is not None:
+                    queue.append(contents)
+        return tree
+
+    def to_dict(self) -> Dict:
+        """Convert back to a nested structure dictionary"""
+        structure: Dict = {}
+        stack = [(0, structure)]
+        while stack:
+            index, node = stack.pop()
+            for child in self.children(index):
+                if self.is_dir(child):
+                    node[self.name(child)] = contents = {}
+                    stack.append((child, contents))
+                else:
+                    node[self.name(child)] = None
+        return structure
+
+
+class _CompactItems(ItemsView):
+    """Items of a CompactNode, read straight from the tree's columns"""
+
+    def __iter__(self):
+        node = self._mapping
+        tree = node.tree
+        for child in node.child_range:
+            yield tree.name(child), CompactNode(tree, child) if tree.is_dir(child) else None
+
+
+class CompactNode(Mapping):
+    """Read-only dictionary view of one folder in a CompactTree.
+
+    Behaves like the dicts returned by FolderDisplay.get_structure:
+    folders map to another view and files map to None. Looking up a
+    single name scans the folder's children; iterate items() instead
+    when visiting a whole folder.
+    """
+
+    __slots__ = ('tree', 'index', 'child_range')
+
+    def __init__(self, tree: CompactTree, index: int):
+        self.tree = tree
+        self.index = index
+        self.child_range = tree.children(index)
+
+    def __repr__(self) -> str:
+        return f"CompactNode({self.tree.full_path(self.index)!r}, {len(self)} entries)"
+
+    def __len__(self) -> int:
+        return len(self.child_range)
+
+    def __iter__(self) -> Iterator[str]:
+        for child in self.child_range:
+            yield self.tree.name(child)
+
+    def __getitem__(self, name: str) -> Optional['CompactNode']:
+        for child in self.child_range:
+            if self.tree.name(child) == name:
+                return CompactNode(self.tree, child) if self.tree.is_dir(child) else None
+        raise KeyError(name)
+
+    def items(self) -> _CompactItems:
+        return _CompactItems(self)
+
+
+def scan_compact(scanner: Scanner, path: str) -> CompactTree:
+    """Scan a folder straight into a CompactTree, without building dicts.
+
+    Folders are listed breadth-first, so a folder reachable twice through
+    symlinks may be expanded at a different place than in Scanner.scan.
+    """
+    tree = CompactTree(path)
+    root_dev, visited = scanner._start(path)
+    # Every folder is queued, in index order; None marks one not descended into
+    queue = deque([path])
+    while queue:
+        dir_path = queue.popleft()
+        tree._start_children()
+        if dir_path is None:
+            continue
+        for name, entry_path, is_dir, descend in scanner._read_dir(dir_path, root_dev, visited):
+            tree._append(name, is_dir)
+            if is_dir:
+                queue.append(entry_path if descend else None)
+    return tree
@@ -0,0 +1,194 @@
+import os
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# Per folder, keyed by path relative to the scanned folder ('' for itself):
+# (own st_mtime_ns, newest st_mtime_ns of any folder in the subtree, entries in the subtree)
+Stamps = Dict[str, Tuple[int, int, int]]
+
+# Sort key of (name, contents) items
+_name = itemgetter(0)
+
+# Recorded instead of an mtime that cannot be trusted, so the folder is never skipped
+UNKNOWN = -1
+
+# Folders modified this close to the start of a scan are stamped UNKNOWN,
+# since coarse filesystem timestamps can round a later change down
+_SETTLE_NS = 2 * 10**9
+
+
+class StampColumns:
+    """Stamps of a CompactTree's folders, as three columns in folder order.
+
+    Slot i holds the stamp of the folder at tree.dir_index[i], so a
+    folder's stamp is found by bisecting, with no path keys at all.
+    Snapshot.load keeps the columns as views of the snapshot file, so
+    nothing is parsed until diff visits a folder.
+    """
+
+    def __init__(self, tree, mtime: Sequence[int], newest: Sequence[int], count: Sequence[int]):
+        self.tree = tree
+        self.mtime = mtime
+        self.newest = newest
+        self.count = count
+
+    @classmethod
+    def from_stamps(cls, tree, stamps: Stamps) -> 'StampColumns':
+        """Lay out stamps recorded by record_stamps along a tree's folders"""
+        columns = cls(tree, array('q'), array('q'), array('q'))
+        # Every folder's parent comes earlier in dir_index, so its path is known first
+        rel_paths: List[str] = []
+        for index in tree.dir_index:
+            if index:
+                parent = rel_paths[bisect_left(tree.dir_index, tree.parent(index))]
+                rel_paths.append(os.path.join(parent, tree.name(index)))
+            else:
+                rel_paths.append('')
+            mtime, newest, count = stamps.get(rel_paths[-1], (UNKNOWN, UNKNOWN, 0))
+            columns.mtime.append(mtime)
+            columns.newest.append(newest)
+            columns.count.append(count)
+        return columns
+
+    def for_node(self, node) -> Optional[Tuple[int, int, int]]:
+        """Get the stamp of a CompactNode of this tree, None for anything else"""
+        if getattr(node, 'tree', None) is not self.tree:
+            return None
+        slot = bisect_left(self.tree.dir_index, node.index)
+        if slot == len(self.tree.dir_index) or self.tree.dir_index[slot] != node.index:
+            return None
+        return self.mtime[slot], self.newest[slot], self.count[slot]
+
+
+# Either form of stamps accepted by diff_structures
+AnyStamps = Union[Stamps, StampColumns]
+
+
+class DiffEntry(NamedTuple):
+    """An entry that differs between two scans.
+
+    A folder that was added or removed is reported once, not entry by
+    entry. CHANGED means the entry turned from a file into a folder or
+    back; file contents are not compared.
+    """
+    kind: str
+    path: str
+    is_dir: bool
+
+
+def record_stamps(structure: Mapping, path: str, since_ns: int) -> Stamps:
+    """Stat every folder of a finished scan and record its stamp.
+
+    since_ns is the time, in nanoseconds since the epoch, at which the
+    scan started. A folder modified after that may have changed while it
+    was being listed, so it and every folder above it are stamped UNKNOWN.
+    """
+    stamps: Stamps = {}
+    # Frames are [relative path, child iterator, newest child stamp, entries, any child unknown]
+    stack = [['', iter(structure.items()), 0, 0, False]]
+    while stack:
+        frame = stack[-1]
+        for name, contents in frame[1]:
+            frame[3] += 1
+            if contents is not None:
+                stack.append([os.path.join(frame[0], name), iter(contents.items()), 0, 0, False])
+                break
+        else:
+            stack.pop()
+            rel_path, _, newest, count, unknown = frame
+            try:
+                mtime = os.stat(os.path.join(path, rel_path)).st_mtime_ns
+            except OSError:
+                mtime = UNKNOWN
+            if mtime >= since_ns - _SETTLE_NS:
+                mtime = UNKNOWN
+            newest = UNKNOWN if unknown or mtime == UNKNOWN else max(mtime, newest)
+            stamps[rel_path] = (mtime, newest, count)
+            if stack:
+                parent = stack[-1]
+                parent[3] += count
+                if newest == UNKNOWN:
+                    parent[4] = True
+                elif newest > parent[2]:
+                    parent[2] = newest
+    return stamps
+
+
+def _stamp(stamps: AnyStamps, rel_path: str, node: Mapping) -> Optional[Tuple[int, int, int]]:
+    if isinstance(stamps, StampColumns):
+        return stamps.for_node(node)
+    return stamps.get(rel_path)
+
+
+def _unchanged(rel_path: str, old_node: Mapping, new_node: Mapping,
+               old_stamps: Optional[AnyStamps], new_stamps: Optional[AnyStamps]) -> bool:
+    """Whether a folder's subtree can be skipped: same newest mtime and entry count on both sides.
+
+    Changing a folder's entries sets its mtime to the current time, which
+    is later than anything the older scan recorded, so an equal newest
+    mtime means no folder in the subtree changed.
+    """
+    if old_stamps is None or new_stamps is None:
+        return False
+    old = _stamp(old_stamps, rel_path, old_node)
+    if old is None or old[1] == UNKNOWN:
+        return False
+    new = _stamp(new_stamps, rel_path, new_node)
+    return new is not None and old[1:] == new[1:]
+
+
+def diff_structures(old: Mapping, new: Mapping, path: str = '',
+                    old_stamps: Optional[AnyStamps] = None,
+                    new_stamps: Optional[AnyStamps] = None) -> List[DiffEntry]:
+    """Compare two structures of the same folder and list what differs.
+
+    Each folder's items are sorted by name on both sides and merge-joined,
+    so a folder of k entries costs O(k log k) for any Mapping, including
+    the CompactTree views of loaded snapshots. With stamps for both sides
+    (record_stamps, or StampColumns for a CompactTree), subtrees whose
+    newest folder mtime and entry count match are skipped without being
+    compared. Entries come out folder by folder in sorted order, with
+    paths joined onto path.
+    """
+    changes: List[DiffEntry] = []
+    stack = [('', old, new)]
+    while stack:
+        rel_path, old_node, new_node = stack.pop()
+        if _unchanged(rel_path, old_node, new_node, old_stamps, new_stamps):
+            continue
+        # Each side's items are read once and sorted; names are never looked
+        # up, since a CompactNode or LazyNode lookup scans the whole folder
+        old_items = sorted(old_node.items(), key=_name)
+        new_items = sorted(new_node.items(), key=_name)
+        subdirs = []
+        i = j = 0
+        while i < len(old_items) or j < len(new_items):
+            if j == len(new_items) or (i < len(old_items) and old_items[i][0] < new_items[j][0]):
+                name, old_contents = old_items[i]
+                changes.append(DiffEntry(REMOVED, os.path.join(path, rel_path, name),
+                                         old_contents is not None))
+                i += 1
+            elif i == len(old_items) or new_items[j][0] < old_items[i][0]:
+                name, new_contents = new_items[j]
+                changes.append(DiffEntry(ADDED, os.path.join(path, rel_path, name),
+                                         new_contents is not None))
+                j += 1
+            else:
+                name, old_contents = old_items[i]
+                new_contents = new_items[j][1]
+                if (old_contents is None) != (new_contents is None):
+                    changes.append(DiffEntry(CHANGED, os.path.join(path, rel_path, name),
+                                             new_contents is not None))
+                elif old_contents is not None:
+                    subdirs.append((os.path.join(rel_path, name), old_contents, new_contents))
+                i += 1
+                j += 1
+        # Reversed so the first folder is compared next, keeping depth-first order
+        stack.extend(reversed(subdirs))
+    return changes
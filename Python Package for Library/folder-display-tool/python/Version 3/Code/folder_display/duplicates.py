@@ -0,0 +1,174 @@
+import hashlib
+import io
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .exporters import JSONExporter, Output, TextExporter
+from .scanner import Entry
+from .usage import format_size
+
+
+class DuplicateGroup(NamedTuple):
+    """Files with identical contents"""
+    size: int
+    digest: str
+    paths: List[str]
+
+    @property
+    def wasted(self) -> int:
+        """Bytes that removing every copy but one would free"""
+        return self.size * (len(self.paths) - 1)
+
+
+class Duplicates:
+    """Groups of identical files found by DuplicateFinder, largest waste first.
+
+    Each to_* method writes to a path or writable when given one and
+    returns the text otherwise. Both render the groups as a structure of
+    one folder per group holding its paths, so the output comes from the
+    same exporters as a folder listing.
+    """
+
+    def __init__(self, groups: List[DuplicateGroup], errors: List[Tuple[str, OSError]]):
+        self.groups = groups
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def wasted(self) -> int:
+        """Bytes that removing every duplicate would free"""
+        return sum(group.wasted for group in self.groups)
+
+    def structure(self) -> Dict:
+        """Get the groups as a structure dictionary, one key per group"""
+        return {f"{format_size(group.size)} x {len(group.paths)} ({group.digest[:16]})":
+                dict.fromkeys(group.paths) for group in self.groups}
+
+    def _export(self, exporter, output_file: Optional[Output]) -> Optional[str]:
+        """Run an exporter on the groups, returning the text if no output is given"""
+        if output_file is not None:
+            exporter.export(self.structure(), output_file)
+            return None
+        buffer = io.StringIO()
+        exporter.export(self.structure(), buffer)
+        return buffer.getvalue()
+
+    def to_text(self, output_file: Optional[Output] = None) -> Optional[str]:
+        """Export the groups as text"""
+        return self._export(TextExporter, output_file)
+
+    def to_json(self, output_file: Optional[Output] = None) -> Optional[str]:
+        """Export the groups as JSON"""
+        return self._export(JSONExporter, output_file)
+
+
+class DuplicateFinder:
+    """Find files with identical contents while reading as little as possible.
+
+    Files are grouped by size first, which costs one lstat per file: the
+    scan itself only reads directory listings, so it has no size to
+    reuse. Files that share a size are compared on a hash
+    of their first and last head_size bytes, and only files still tied
+    after that are hashed in full, read_size bytes at a time. Hashing runs
+    on a thread pool; hashlib releases the GIL on large buffers, so reads
+    and hashing of different files overlap.
+
+    Only regular files are compared; symlinks are skipped. Hard links to
+    one file count as a single file, since removing one frees nothing.
+    Files that cannot be read are left out and listed in errors.
+    """
+
+    def __init__(self, workers: int = 8, min_size: int = 1, head_size: int = 64 * 1024,
+                 read_size: int = 1024 * 1024, algorithm: str = 'blake2b'):
+        self.workers = workers
+        self.min_size = min_size
+        self.head_size = head_size
+        self.read_size = read_size
+        self.algorithm = algorithm
+        self.errors: List[Tuple[str, OSError]] = []
+
+    def _group_by_size(self, entries: Iterable[Entry]) -> List[Tuple[int, List[str]]]:
+        """lstat every file and keep the sizes shared by more than one"""
+        by_size: Dict[int, List[str]] = {}
+        inodes: Set[Tuple[int, int]] = set()
+        for entry in entries:
+            if entry.is_dir:
+                continue
+            try:
+                st = os.stat(entry.path, follow_symlinks=False)
+            except OSError as e:
+                self.errors.append((entry.path, e))
+                continue
+            if not stat.S_ISREG(st.st_mode) or st.st_size < self.min_size:
+                continue
+            if st.st_nlink > 1:
+                key = (st.st_dev, st.st_ino)
+                if key in inodes:
+                    continue
+                inodes.add(key)
+            by_size.setdefault(st.st_size, []).append(entry.path)
+        return [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+
+    def _partial_hash(self, path: str, size: int) -> Optional[str]:
+        """Hash the head and tail of a file (the whole file when it is small)"""
+        digest = hashlib.new(self.algorithm)
+        try:
+            with open(path, 'rb') as f:
+                if size <= 2 * self.head_size:
+                    digest.update(f.read())
+                else:
+                    digest.update(f.read(self.head_size))
+                    f.seek(-self.head_size, os.SEEK_END)
+                    digest.update(f.read(self.head_size))
+        except OSError as e:
+            self.errors.append((path, e))
+            return None
+        return digest.hexdigest()
+
+    def _full_hash(self, path: str, size: int) -> Optional[str]:
+        """Hash a whole file through one reused buffer"""
+        digest = hashlib.new(self.algorithm)
+        buffer = bytearray(min(self.read_size, size) or 1)
+        view = memoryview(buffer)
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                while True:
+                    n = f.readinto(buffer)
+                    if not n:
+                        break
+                    digest.update(view[:n])
+        except OSError as e:
+            self.errors.append((path, e))
+            return None
+        return digest.hexdigest()
+
+    def _refine(self, pool: ThreadPoolExecutor, groups: List[Tuple[int, List[str]]],
+                hash_file: Callable[[str, int], Optional[str]]) -> List[Tuple[int, str, List[str]]]:
+        """Split each group by a hash of its files, keeping groups of two or more"""
+        jobs = [(size, path) for size, paths in groups for path in paths]
+        digests = pool.map(lambda job: hash_file(job[1], job[0]), jobs)
+        refined: Dict[Tuple[int, str], List[str]] = {}
+        for (size, path), digest in zip(jobs, digests):
+            if digest is not None:
+                refined.setdefault((size, digest), []).append(path)
+        return [(size, digest, paths) for (size, digest), paths in refined.items() if len(paths) > 1]
+
+    def find(self, entries: Iterable[Entry]) -> Duplicates:
+        """Find the duplicate files among a scan's entries"""
+        self.errors = []
+        by_size = self._group_by_size(entries)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            partial = self._refine(pool, by_size, self._partial_hash)
+            # Small files were read whole, so their partial hash is already final
+            done = [group for group in partial if group[0] <= 2 * self.head_size]
+            pending = [(size, paths) for size, _, paths in partial if size > 2 * self.head_size]
+            done += self._refine(pool, pending, self._full_hash)
+        groups = [DuplicateGroup(size, digest, paths) for size, digest, paths in done]
+        groups.sort(key=lambda group: (-group.wasted, group.paths[0]))
+        return Duplicates(groups, self.errors)
@@ -0,0 +1,308 @@
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+GITIGNORE = '.gitignore'
+
+# Characters that make a pattern a glob rather than a literal name or path
+_GLOB_CHARS = re.compile(r'[*?\[\\]')
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Translate a gitignore glob to a regex over '/'-separated relative paths.
+
+    '*' and '?' stop at '/', '**/' matches any number of folders and a
+    trailing '/**' matches everything inside a folder.
+    """
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == '*':
+            if glob.startswith('**', i) and (i == 0 or glob[i - 1] == '/'):
+                if i + 2 == n:
+                    out.append('.*')
+                    i += 2
+                    continue
+                if glob[i + 2] == '/':
+                    out.append('(?:.*/)?')
+                    i += 3
+                    continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = glob.find(']', i + 2 if glob.startswith('[!', i) or glob.startswith('[^', i) else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end].replace('\\', '\\\\')
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def _combine(regexes: List[str]) -> Optional[Pattern]:
+    if not regexes:
+        return None
+    return re.compile('(?:' + '|'.join(regexes) + r')\Z', re.DOTALL)
+
+
+class _Run:
+    """Consecutive patterns of the same polarity, compiled together.
+
+    Literal names and anchored literal paths go into sets, and '*.ext'
+    style patterns into one tuple for str.endswith; every other pattern
+    becomes one branch of a combined regex, so a run costs at most a few
+    set lookups and two regex matches per entry however many patterns it
+    holds. Directory-only patterns (trailing '/') get their own sets and
+    regexes, consulted for folders only.
+    """
+
+    def __init__(self, negated: bool):
+        self.negated = negated
+        self.names: Set[str] = set()
+        self.paths: Set[str] = set()
+        self.dir_names: Set[str] = set()
+        self.dir_paths: Set[str] = set()
+        self._suffixes: Dict[bool, List[str]] = {False: [], True: []}
+        self._name_globs: Dict[bool, List[str]] = {False: [], True: []}
+        self._path_globs: Dict[bool, List[str]] = {False: [], True: []}
+
+    def add(self, pattern: str, dir_only: bool, anchored: bool) -> None:
+        literal = not _GLOB_CHARS.search(pattern)
+        if anchored:
+            if literal:
+                (self.dir_paths if dir_only else self.paths).add(pattern)
+            else:
+                self._path_globs[dir_only].append(_glob_to_regex(pattern))
+        elif literal:
+            (self.dir_names if dir_only else self.names).add(pattern)
+        elif pattern.startswith('*') and not _GLOB_CHARS.search(pattern, 1):
+            self._suffixes[dir_only].append(pattern[1:])
+        else:
+            self._name_globs[dir_only].append(_glob_to_regex(pattern))
+
+    def compile(self) -> None:
+        self.name_re = _combine(self._name_globs[False])
+        self.path_re = _combine(self._path_globs[False])
+        self.dir_name_re = _combine(self._name_globs[True])
+        self.dir_path_re = _combine(self._path_globs[True])
+        self.suffixes = tuple(self._suffixes[False])
+        self.dir_suffixes = tuple(self._suffixes[True])
+        del self._name_globs, self._path_globs, self._suffixes
+
+    def matches(self, name: str, rel_path: str, is_dir: bool) -> bool:
+        if name in self.names or rel_path in self.paths:
+            return True
+        if self.suffixes and name.endswith(self.suffixes):
+            return True
+        if self.name_re is not None and self.name_re.match(name):
+            return True
+        if self.path_re is not None and self.path_re.match(rel_path):
+            return True
+        if not is_dir:
+            return False
+        if name in self.dir_names or rel_path in self.dir_paths:
+            return True
+        if self.dir_suffixes and name.endswith(self.dir_suffixes):
+            return True
+        if self.dir_name_re is not None and self.dir_name_re.match(name):
+            return True
+        return self.dir_path_re is not None and bool(self.dir_path_re.match(rel_path))
+
+
+class RuleSet:
+    """Compiled patterns from one source (a pattern list or a .gitignore file).
+
+    Follows gitignore rules: '#' starts a comment, '!' re-includes, a
+    trailing '/' only matches folders, and a pattern containing any other
+    '/' is anchored to the folder the rules apply from. As in git, the
+    last matching pattern decides.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.runs: List[_Run] = []
+        for line in patterns:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated or line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if line.startswith('**/') and '/' not in line[3:]:
+                # '**/name' matches at any depth, like a bare name
+                line, anchored = line[3:], False
+            if not self.runs or self.runs[-1].negated != negated:
+                self.runs.append(_Run(negated))
+            self.runs[-1].add(line, dir_only, anchored)
+        for run in self.runs:
+            run.compile()
+
+    def __bool__(self) -> bool:
+        return bool(self.runs)
+
+    def verdict(self, name: str, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True if excluded, False if re-included, None if no pattern matches"""
+        for run in reversed(self.runs):
+            if run.matches(name, rel_path, is_dir):
+                return not run.negated
+        return None
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RuleSet':
+        with open(path, encoding='utf-8', errors='surrogateescape') as f:
+            return cls(f)
+
+
+class DirRules:
+    """The rule sets that apply inside one folder, innermost last"""
+
+    __slots__ = ('sets', '_run', '_prefix')
+
+    def __init__(self, sets: Tuple[Tuple[RuleSet, str], ...]):
+        # (rules, path of this folder relative to the rules' folder plus '/')
+        self.sets = sets
+        # The common case, one source without negations, skips the verdict chain
+        self._run: Optional[_Run] = None
+        self._prefix = ''
+        if len(sets) == 1 and len(sets[0][0].runs) == 1 and not sets[0][0].runs[0].negated:
+            self._run = sets[0][0].runs[0]
+            self._prefix = sets[0][1]
+
+    def excludes(self, name: str, is_dir: bool) -> bool:
+        """Check whether an entry of this folder is excluded"""
+        if self._run is not None:
+            return self._run.matches(name, self._prefix + name, is_dir)
+        for rules, prefix in reversed(self.sets):
+            verdict = rules.verdict(name, prefix + name, is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+
+class PathFilter:
+    """Exclusion patterns with gitignore semantics, applied while scanning.
+
+    Pass to a Scanner as ``exclude``. Anchored patterns are relative to
+    the scanned folder. Excluded folders are pruned before they are
+    listed, so nothing below them is read. With ``read_gitignore``, each
+    folder's .gitignore is read when the folder is reached and applies
+    to everything below it, taking precedence over the patterns given
+    here and over .gitignore files higher up. Edits to .gitignore files
+    during a watch are not picked up.
+
+    Each thread keeps the rules of the last folder it asked for and of
+    that folder's ancestors only, so memory grows with the depth of the
+    tree, not with the number of folders. A depth-first scan never
+    computes a folder's rules twice. A breadth-first or parallel scan
+    may recompute (and re-read the .gitignore of) a folder when it
+    returns to that folder's children.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), read_gitignore: bool = False):
+        self.patterns = list(patterns)
+        self.read_gitignore = read_gitignore
+        self.rules = RuleSet(self.patterns)
+        self.root: Optional[str] = None
+        self._root_key: Optional[str] = None
+        self._generation = 0
+        self._local = threading.local()
+
+    def __getstate__(self) -> Dict:
+        # Sent to process-parallel scanners without the per-thread state
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def start(self, root: str) -> None:
+        """Anchor the patterns at a folder about to be scanned"""
+        self.root = root
+        # Entry paths of the root's children are joined onto it without a trailing separator
+        self._root_key = root.rstrip(os.sep) or root
+        self._generation += 1
+
+    def _chain(self) -> List[Tuple[str, Optional[DirRules]]]:
+        """The calling thread's (folder, rules) pairs: a folder and its ancestors, outermost first"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.generation = self._generation
+            local.chain = []
+        return local.chain
+
+    def _own_rules(self, dir_path: str) -> Optional[RuleSet]:
+        if not self.read_gitignore:
+            return None
+        try:
+            rules = RuleSet.from_file(os.path.join(dir_path, GITIGNORE))
+        except (FileNotFoundError, NotADirectoryError, PermissionError, IsADirectoryError):
+            return None
+        return rules or None
+
+    def _is_top(self, dir_path: str) -> bool:
+        """Whether a folder's rules start from the given patterns (the scan root)"""
+        parent_path, name = os.path.split(dir_path)
+        return dir_path == self._root_key or not name or parent_path == dir_path
+
+    def _compute(self, dir_path: str, parent: Optional[DirRules], top: bool) -> Optional[DirRules]:
+        """Build a folder's rules from its parent's and its own .gitignore"""
+        if top:
+            sets: Tuple[Tuple[RuleSet, str], ...] = ((self.rules, ''),) if self.rules else ()
+        else:
+            name = os.path.basename(dir_path)
+            sets = () if parent is None else tuple(
+                (rules, f"{prefix}{name}/") for rules, prefix in parent.sets)
+        own = self._own_rules(dir_path)
+        if own is not None:
+            sets += ((own, ''),)
+        return DirRules(sets) if sets else None
+
+    def rules_for(self, dir_path: str) -> Optional[DirRules]:
+        """Get the rules for the entries of a folder (None when nothing can match)"""
+        if dir_path == self.root:
+            dir_path = self._root_key
+        chain = self._chain()
+        parent_path, name = os.path.split(dir_path)
+        if chain and chain[-1][0] == parent_path and name and dir_path != self._root_key:
+            # Depth-first scans ask for a child of the last folder most of the time
+            chain.append((dir_path, self._compute(dir_path, chain[-1][1], False)))
+            return chain[-1][1]
+        # Drop kept folders that dir_path is not inside of
+        while chain:
+            kept = chain[-1][0]
+            if dir_path == kept:
+                return chain[-1][1]
+            if dir_path.startswith(kept if kept.endswith(os.sep) else kept + os.sep):
+                break
+            chain.pop()
+        # Folders from dir_path up to the deepest kept one (or the root), not yet computed
+        missing = [dir_path]
+        while not self._is_top(missing[-1]):
+            parent_path = os.path.dirname(missing[-1])
+            if chain and chain[-1][0] == parent_path:
+                break
+            missing.append(parent_path)
+        top = self._is_top(missing[-1])
+        for path in reversed(missing):
+            chain.append((path, self._compute(path, None if top else chain[-1][1], top)))
+            top = False
+        return chain[-1][1]
@@ -1,10 +1,65 @@
 import json
-from typing import Dict
+import os
+from collections.abc import Mapping
+from contextlib import contextmanager
+from json.encoder import encode_basestring_ascii
+from typing import Callable, Dict, IO, Iterable, Iterator, Optional, Tuple, Union
+
+from .scanner import Entry, iter_structure
+from .usage import DiskUsage
+
+# Exporters accept a structure dictionary or a stream of scan entries
+Source = Union[Mapping, Iterable[Entry]]
+# ... and write to a file path or any text writable
+Output = Union[str, IO[str]]
+
+# Entries rendered before their text is handed to the output in one write
+BATCH_SIZE = 2048
+
+
+@contextmanager
+def _open_output(output: Output) -> Iterator[Callable[[str], object]]:
+    """Open a path for writing, or use a writable without taking ownership"""
+    if isinstance(output, str):
+        with open(output, 'w', encoding='utf-8') as f:
+            yield f.write
+    else:
+        yield output.write
+
+
+def _structure_rows(structure: Mapping) -> Iterator[Tuple[int, str, bool]]:
+    """Yield (depth, name, is_dir) for a structure dictionary depth-first"""
+    stack = [iter(structure.items())]
+    while stack:
+        depth = len(stack) - 1
+        for name, contents in stack[-1]:
+            yield depth, name, contents is not None
+            if contents:
+                stack.append(iter(contents.items()))
+                break
+        else:
+            stack.pop()
+
+
+def _rows(source: Source) -> Iterator[Tuple[int, str, bool]]:
+    """Yield (depth, name, is_dir) for either kind of export source"""
+    if isinstance(source, Mapping):
+        return _structure_rows(source)
+    return ((entry.depth, entry.name, entry.is_dir) for entry in source)
+
+
+def _usage_json(usage: DiskUsage, entry_id: int) -> str:
+    """Open the JSON object holding an entry's usage (and children, for a folder)"""
+    if not usage.is_dir[entry_id]:
+        return (f'{{"size": {usage.size[entry_id]}, "blocks": {usage.blocks[entry_id]}, '
+                f'"mtime": {usage.mtime[entry_id]!r}}}')
+    return (f'{{"size": {usage.size[entry_id]}, "blocks": {usage.blocks[entry_id]}, '
+            f'"files": {usage.files[entry_id]}, "dirs": {usage.dirs[entry_id]}, '
+            f'"mtime": {usage.mtime[entry_id]!r}, "children": {{')
+
 
 class HTMLExporter:
-    @staticmethod
-    def export(structure: Dict, output_file: str) -> None:
-        html = """
+    HEADER = """
         <html>
         <head>
             <style>
@@ -26,45 +81,212 @@ class HTMLExporter:
         <body>
             <div class="tree">
         """
-        html += HTMLExporter._structure_to_html(structure)
-        html += """
+    FOOTER = """
             </div>
         </body>
         </html>
         """
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-    
+
+    @staticmethod
+    def export(structure: Source, output_file: Output, usage: Optional[DiskUsage] = None) -> None:
+        """Write nested lists for a structure or entry stream, one chunk at a time.
+
+        With usage (from FolderDisplay.disk_usage), each name is followed
+        by its size and, for folders, file count.
+        """
+        rows = _rows(structure)
+        if usage is not None:
+            rows = ((depth, f'{name} <span class="usage">({usage.label(entry_id)})</span>', is_dir)
+                    for entry_id, (depth, name, is_dir) in enumerate(rows, 1))
+        with _open_output(output_file) as write:
+            write(HTMLExporter.HEADER)
+            HTMLExporter._write_tree(rows, write)
+            write(HTMLExporter.FOOTER)
+
     @staticmethod
-    def _structure_to_html(structure: Dict) -> str:
-        html = "<ul>"
-        for name, contents in structure.items():
-            html += f"<li>{name}"
-            if contents:  # If it's a directory
-                html += HTMLExporter._structure_to_html(contents)
-            html += "</li>"
-        html += "</ul>"
-        return html
+    def export_entries(entries: Iterable[Entry], output_file: Output) -> None:
+        """Write entries from a streaming scan as they arrive"""
+        HTMLExporter.export(entries, output_file)
+
+    @staticmethod
+    def _write_tree(rows: Iterable[Tuple[int, str, bool]], write: Callable[[str], object]) -> None:
+        parts = ["<ul>"]
+        current = -1  # depth of the last open <li>
+        for depth, name, _ in rows:
+            if depth == current:
+                parts.append(f"</li><li>{name}")
+            elif depth > current:
+                parts.append(f"<ul><li>{name}" if current >= 0 else f"<li>{name}")
+            else:
+                parts.append("</li>" + "</ul></li>" * (current - depth) + f"<li>{name}")
+            current = depth
+            if len(parts) >= BATCH_SIZE:
+                write("".join(parts))
+                parts.clear()
+        if current >= 0:
+            parts.append("</li>" + "</ul></li>" * current)
+        parts.append("</ul>")
+        write("".join(parts))
 
 class JSONExporter:
     @staticmethod
-    def export(structure: Dict, output_file: str) -> None:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(structure, f, indent=2)
+    def export(structure: Source, output_file: Output, usage: Optional[DiskUsage] = None) -> None:
+        """Write a structure or entry stream as indented JSON, one chunk at a time.
+
+        With usage (from FolderDisplay.disk_usage), every entry becomes an
+        object with its size, blocks and mtime; folders add files, dirs
+        and their entries under "children".
+        """
+        with _open_output(output_file) as write:
+            if usage is None:
+                JSONExporter._write_tree(_rows(structure), write)
+            else:
+                JSONExporter._write_usage_tree(_rows(structure), usage, write)
+
+    @staticmethod
+    def export_entries(entries: Iterable[Entry], output_file: Output) -> None:
+        """Write entries from a streaming scan as they arrive"""
+        JSONExporter.export(entries, output_file)
+
+    @staticmethod
+    def _write_tree(rows: Iterable[Tuple[int, str, bool]], write: Callable[[str], object]) -> None:
+        """Produce the same text as json.dump(structure, indent=2)"""
+        parts = ["{"]
+        current = -1  # depth of the previous entry
+        pending_dir = False
+        for depth, name, is_dir in rows:
+            key = encode_basestring_ascii(name)
+            if depth == current:
+                parts.append(f"{'{}' if pending_dir else 'null'},\n{'  ' * (depth + 1)}{key}: ")
+            elif depth > current:
+                parts.append(f"{'{' if current >= 0 else ''}\n{'  ' * (depth + 1)}{key}: ")
+            else:
+                parts.append(JSONExporter._closing(pending_dir, current, depth)
+                             + f",\n{'  ' * (depth + 1)}{key}: ")
+            pending_dir = is_dir
+            current = depth
+            if len(parts) >= BATCH_SIZE:
+                write("".join(parts))
+                parts.clear()
+        if current >= 0:
+            parts.append(JSONExporter._closing(pending_dir, current, 0) + "\n")
+        parts.append("}")
+        write("".join(parts))
+
+    @staticmethod
+    def _write_usage_tree(rows: Iterable[Tuple[int, str, bool]], usage: DiskUsage,
+                          write: Callable[[str], object]) -> None:
+        """Write one line per entry, each opening an object with its usage"""
+        parts = [_usage_json(usage, 0)]
+        current = -1  # depth of the previous entry
+        pending_dir = False  # whether the previous entry left a children object open
+        for entry_id, (depth, name, is_dir) in enumerate(rows, 1):
+            if depth > current:
+                separator = "\n"
+            else:
+                separator = "}}" * (current - depth + pending_dir) + ",\n"
+            parts.append(f"{separator}{'  ' * (depth + 1)}{encode_basestring_ascii(name)}: "
+                         + _usage_json(usage, entry_id))
+            pending_dir = is_dir
+            current = depth
+            if len(parts) >= BATCH_SIZE:
+                write("".join(parts))
+                parts.clear()
+        parts.append("}}" * (max(current, 0) + 1 + pending_dir) + "\n")
+        write("".join(parts))
+
+    @staticmethod
+    def _closing(pending_dir: bool, current: int, depth: int) -> str:
+        """Finish the previous value and close objects down to depth"""
+        return ("{}" if pending_dir else "null") + "".join(
+            "\n" + "  " * level + "}" for level in range(current, depth, -1))
 
 class TextExporter:
     @staticmethod
-    def export(structure: Dict, output_file: str) -> None:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(TextExporter._structure_to_text(structure))
-    
+    def export(structure: Source, output_file: Output, usage: Optional[DiskUsage] = None) -> None:
+        """Write one indented line per entry, one chunk at a time.
+
+        With usage (from FolderDisplay.disk_usage), each line ends with
+        the entry's size and, for folders, file count.
+        """
+        rows = _rows(structure)
+        if usage is not None:
+            rows = ((depth, f"{name} ({usage.label(entry_id)})", is_dir)
+                    for entry_id, (depth, name, is_dir) in enumerate(rows, 1))
+        with _open_output(output_file) as write:
+            parts = []
+            for depth, name, _ in rows:
+                parts.append(f"{'    ' * depth}├── {name}\n")
+                if len(parts) >= BATCH_SIZE:
+                    write("".join(parts))
+                    parts.clear()
+            write("".join(parts))
+
+    @staticmethod
+    def export_entries(entries: Iterable[Entry], output_file: Output) -> None:
+        """Write entries from a streaming scan as they arrive"""
+        TextExporter.export(entries, output_file)
+
+class NDJSONExporter:
+    """JSON Lines export: one self-contained record per entry.
+
+    Each line holds path, depth and type ("dir" or "file"), plus size and
+    mtime when asked. Lines are written every batch_size entries, so an
+    entry stream from FolderDisplay.iter_entries is exported while the
+    scan runs, and memory stays flat. orjson encodes the records when it
+    is installed.
+    """
+
     @staticmethod
-    def _structure_to_text(structure: Dict, level: int = 0) -> str:
-        text = ""
-        indent = "    " * level
-        for name, contents in structure.items():
-            text += f"{indent}├── {name}\n"
-            if contents:  # If it's a directory
-                text += TextExporter._structure_to_text(contents, level + 1)
-        return text 
\ No newline at end of file
+    def export(structure: Source, output_file: Output, path: str = '', stat: bool = False,
+               batch_size: int = BATCH_SIZE) -> None:
+        """Write one JSON record per entry; path is the root of a structure dictionary.
+
+        With stat, every entry is stat'ed (without following symlinks) for
+        its size and mtime; both are null when that fails.
+        """
+        entries = iter_structure(structure, path) if isinstance(structure, Mapping) else structure
+        encode = NDJSONExporter._encoder()
+        with _open_output(output_file) as write:
+            parts = []
+            for entry in entries:
+                record: Dict[str, object] = {
+                    'path': entry.path,
+                    'depth': entry.depth,
+                    'type': 'dir' if entry.is_dir else 'file',
+                }
+                if stat:
+                    try:
+                        st = os.stat(entry.path, follow_symlinks=False)
+                        record['size'], record['mtime'] = st.st_size, st.st_mtime
+                    except OSError:
+                        record['size'] = record['mtime'] = None
+                parts.append(encode(record))
+                if len(parts) >= batch_size:
+                    write("".join(parts))
+                    parts.clear()
+            write("".join(parts))
+
+    @staticmethod
+    def export_entries(entries: Iterable[Entry], output_file: Output, stat: bool = False,
+                       batch_size: int = BATCH_SIZE) -> None:
+        """Write entries from a streaming scan as they arrive"""
+        NDJSONExporter.export(entries, output_file, stat=stat, batch_size=batch_size)
+
+    @staticmethod
+    def _encoder() -> Callable[[Dict[str, object]], str]:
+        """Get the fastest available function turning a record into one line"""
+        dumps = json.JSONEncoder(separators=(',', ':')).encode
+        # Imported here so only NDJSON exports pay for loading it
+        try:
+            import orjson
+        except ImportError:
+            return lambda record: dumps(record) + "\n"
+
+        def encode(record: Dict[str, object]) -> str:
+            try:
+                return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE).decode('utf-8')
+            except TypeError:
+                # orjson rejects names that are not valid UTF-8 (surrogate escapes)
+                return dumps(record) + "\n"
+        return encode
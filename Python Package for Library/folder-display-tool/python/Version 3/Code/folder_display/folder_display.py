@@ -1,66 +1,282 @@
 import os
-from typing import List, Optional, Set
-from .exporters import HTMLExporter, JSONExporter, TextExporter
+import time
+from typing import TYPE_CHECKING, Iterator, List, Optional, Set
+from .cache import ScanCache
+from .exclude import PathFilter
+from .scanner import Entry, Scanner, iter_structure
+from .stats import ScanStats
+
+# Everything else is imported by the methods that use it, so importing
+# FolderDisplay (and starting the command line tool) does not load every
+# exporter, process pool and hashing module
+if TYPE_CHECKING:
+    from .analysis import PathAnalyzer
+    from .diff import DiffEntry
+    from .duplicates import Duplicates
+    from .index import NameIndex
+    from .lazy import LazyNode
+    from .snapshot import Snapshot
+    from .usage import DiskUsage
+    from .watch import Watcher
 
 class FolderDisplay:
-    def __init__(self):
+    def __init__(self, workers: int = 1, use_processes: bool = False):
         self.excluded_folders: Set[str] = set()
+        self.exclude_patterns: List[str] = []
+        self.read_gitignore: bool = False
         self.include_hidden: bool = False
+        self.follow_symlinks: bool = True
+        self.same_filesystem: bool = False
+        self.workers: int = workers
+        self.use_processes: bool = use_processes
+        self.compact: bool = False
+        self.cache: Optional[ScanCache] = None
+        self.max_depth: Optional[int] = None
+        self.max_entries_per_dir: Optional[int] = None
+        self.collect_usage: bool = False
+        self.stats: Optional[ScanStats] = None
+        self.ignore_errors: bool = False
         
     def set_excluded_folders(self, folders: List[str]) -> None:
         """Set folders to exclude from display"""
         self.excluded_folders = set(folders)
     
+    def set_exclude_patterns(self, patterns: List[str]) -> None:
+        """Set gitignore-style patterns to exclude (e.g. '*.pyc', 'build/', '/docs/_build')"""
+        self.exclude_patterns = list(patterns)
+    
+    def set_read_gitignore(self, read: bool) -> None:
+        """Set whether .gitignore files found while scanning exclude entries too"""
+        self.read_gitignore = read
+    
     def set_include_hidden(self, include: bool) -> None:
         """Set whether to include hidden files and folders"""
         self.include_hidden = include
     
+    def set_follow_symlinks(self, follow: bool) -> None:
+        """Set whether symlinked folders are descended into"""
+        self.follow_symlinks = follow
+    
+    def set_same_filesystem(self, same: bool) -> None:
+        """Set whether to stay on the filesystem of the scanned folder"""
+        self.same_filesystem = same
+    
+    def set_workers(self, workers: int) -> None:
+        """Set how many threads list directories in parallel (1 scans sequentially)"""
+        self.workers = workers
+    
+    def set_use_processes(self, use_processes: bool) -> None:
+        """Set whether parallel scans shard the tree across processes instead of threads"""
+        self.use_processes = use_processes
+    
+    def set_compact(self, compact: bool) -> None:
+        """Set whether get_structure returns an array-backed CompactTree view.
+
+        Compact scans list folders on a single thread.
+        """
+        self.compact = compact
+    
+    def set_cache(self, cache: Optional[ScanCache]) -> None:
+        """Set a ScanCache to reuse listings of unchanged folders (None disables it)"""
+        self.cache = cache
+    
+    def set_max_depth(self, depth: Optional[int]) -> None:
+        """Set how many levels of entries to list (None for no limit).
+
+        Folders at the limit are returned as empty TruncatedDir dicts.
+        Limited scans run on a single thread and return plain dicts.
+        In du mode (set_collect_usage) the whole tree is still read, so
+        folders at the limit show the totals of everything below them.
+        """
+        self.max_depth = depth
+    
+    def set_max_entries_per_dir(self, limit: Optional[int]) -> None:
+        """Set how many entries to read from each folder (None for no limit)"""
+        self.max_entries_per_dir = limit
+    
+    def set_collect_usage(self, collect: bool) -> None:
+        """Set whether display and the exports show sizes and file counts (du mode).
+
+        Every entry is stat'ed during the scan, which runs on a single thread.
+        """
+        self.collect_usage = collect
+    
+    def set_stats(self, stats: Optional[ScanStats]) -> None:
+        """Set a ScanStats to profile the following scans (None turns profiling off)"""
+        self.stats = stats
+    
+    def set_ignore_errors(self, ignore: bool) -> None:
+        """Set whether folders that cannot be listed are shown empty instead of raising OSError"""
+        self.ignore_errors = ignore
+    
+    def _has_limits(self) -> bool:
+        return self.max_depth is not None or self.max_entries_per_dir is not None
+    
+    def _scanner(self) -> Scanner:
+        """Build a scanner configured with the current options"""
+        options = {
+            'follow_symlinks': self.follow_symlinks,
+            'same_filesystem': self.same_filesystem,
+            'cache': self.cache,
+            'exclude': None,
+            'stats': self.stats,
+            'ignore_errors': self.ignore_errors,
+        }
+        if self.exclude_patterns or self.read_gitignore:
+            options['exclude'] = PathFilter(self.exclude_patterns, self.read_gitignore)
+        if self._has_limits():
+            return Scanner(self.excluded_folders, self.include_hidden, max_depth=self.max_depth,
+                           max_entries_per_dir=self.max_entries_per_dir, **options)
+        if self.workers <= 1:
+            return Scanner(self.excluded_folders, self.include_hidden, **options)
+        from .parallel import ProcessScanner, ThreadedScanner
+        if self.use_processes:
+            return ProcessScanner(self.excluded_folders, self.include_hidden,
+                                  workers=self.workers, **options)
+        return ThreadedScanner(self.excluded_folders, self.include_hidden,
+                               workers=self.workers, **options)
+    
+    def scan_options(self) -> dict:
+        """Get the current scan settings"""
+        return {
+            'excluded_folders': sorted(self.excluded_folders),
+            'exclude_patterns': list(self.exclude_patterns),
+            'read_gitignore': self.read_gitignore,
+            'include_hidden': self.include_hidden,
+            'follow_symlinks': self.follow_symlinks,
+            'same_filesystem': self.same_filesystem,
+            'workers': self.workers,
+            'use_processes': self.use_processes,
+            'compact': self.compact,
+            'max_depth': self.max_depth,
+            'max_entries_per_dir': self.max_entries_per_dir,
+            'collect_usage': self.collect_usage,
+            'ignore_errors': self.ignore_errors,
+        }
+    
     def get_structure(self, path: str) -> dict:
         """Get folder structure as a dictionary"""
-        structure = {}
-        
-        for item in os.listdir(path):
-            # Skip hidden files if not included
-            if not self.include_hidden and item.startswith('.'):
-                continue
-                
-            # Skip excluded folders
-            if item in self.excluded_folders:
-                continue
-                
-            full_path = os.path.join(path, item)
-            if os.path.isdir(full_path):
-                structure[item] = self.get_structure(full_path)
-            else:
-                structure[item] = None
-                
-        return structure
+        if self.compact and not self._has_limits():
+            from .compact import scan_compact
+            return scan_compact(self._scanner(), path).root
+        return self._scanner().scan(path)
     
-    def display(self, path: str, indent: str = "    ") -> str:
-        """Display folder structure as formatted string"""
+    def lazy_structure(self, path: str) -> 'LazyNode':
+        """Get a structure whose folders are listed only when first accessed"""
+        from .lazy import LazyNode
+        return LazyNode.root(self._scanner(), path)
+    
+    def snapshot(self, path: str, stamps: bool = False) -> 'Snapshot':
+        """Scan once and return a snapshot that can be exported in every format.
+
+        With stamps, every folder is stat'ed after the scan so later diffs
+        can skip subtrees that have not changed.
+        """
+        from datetime import datetime
+        from .diff import record_stamps
+        from .snapshot import Snapshot
+        created = datetime.now()
+        started = int(time.time() * 1e9)
         structure = self.get_structure(path)
-        return self._format_structure(structure, indent)
+        return Snapshot(path, structure, self.scan_options(), created,
+                        record_stamps(structure, path, started) if stamps else None)
+    
+    def diff(self, snapshot: 'Snapshot') -> List['DiffEntry']:
+        """Rescan a snapshot's folder and list the entries added, removed or changed since.
+
+        Set a ScanCache to avoid re-reading folders whose listing has not changed.
+        """
+        return snapshot.diff(self.snapshot(snapshot.path, stamps=snapshot.stamps is not None))
+    
+    def watch(self, path: str) -> 'Watcher':
+        """Scan once and keep the structure current from inotify events (Linux only)"""
+        from .watch import Watcher
+        return Watcher(self._scanner(), path)
+    
+    def iter_entries(self, path: str) -> Iterator[Entry]:
+        """Yield folder entries depth-first without building the whole structure"""
+        return self._scanner().iter_entries(path)
+    
+    def _entries(self, path: str) -> Iterator[Entry]:
+        """Stream entries, scanning in parallel first when workers are configured"""
+        if self._has_limits():
+            return self.iter_entries(path)
+        if self.workers > 1 or self.compact:
+            return iter_structure(self.get_structure(path), path)
+        return self.iter_entries(path)
+    
+    def analyze_paths(self, path: str, **options) -> 'PathAnalyzer':
+        """Scan and measure every path; options are passed to PathAnalyzer"""
+        from .analysis import PathAnalyzer
+        analyzer = PathAnalyzer(**options)
+        try:
+            analyzer.add_entries(self._entries(path), path)
+        finally:
+            analyzer.close()
+        return analyzer
+    
+    def find_duplicates(self, path: str, **options) -> 'Duplicates':
+        """Scan and group files with identical contents; options are passed to DuplicateFinder"""
+        from .duplicates import DuplicateFinder
+        return DuplicateFinder(**options).find(self._entries(path))
     
-    def _format_structure(self, structure: dict, indent: str, level: int = 0) -> str:
-        """Format structure dictionary as string with proper indentation"""
-        output = []
-        for name, contents in structure.items():
-            output.append(indent * level + "├── " + name)
-            if contents:  # If it's a directory
-                output.append(self._format_structure(contents, indent, level + 1))
-        return "\n".join(output)
+    def build_index(self, path: str) -> 'NameIndex':
+        """Scan and index every name for substring, glob and regex search"""
+        from .index import NameIndex
+        return NameIndex.from_entries(self._entries(path), path)
+    
+    def disk_usage(self, path: str) -> 'DiskUsage':
+        """Scan once, collecting sizes, file counts and newest mtimes per folder"""
+        from .usage import scan_usage
+        return scan_usage(self._scanner(), path)
+    
+    def iter_display(self, path: str, indent: str = "    ") -> Iterator[str]:
+        """Yield the lines of display one at a time, as the scan finds them"""
+        if self.collect_usage:
+            usage = self.disk_usage(path)
+            return (indent * entry.depth + "├── " + entry.name + (" ..." if entry.truncated else "")
+                    + f" ({usage.label(entry.id)})" for entry in iter_structure(usage.structure, path))
+        return (indent * entry.depth + "├── " + entry.name + (" ..." if entry.truncated else "")
+                for entry in self._entries(path))
+
+    def display(self, path: str, indent: str = "    ") -> str:
+        """Display folder structure as formatted string"""
+        return "\n".join(self.iter_display(path, indent))
     
     def export_html(self, path: str, output_file: str) -> None:
         """Export structure as HTML"""
-        structure = self.get_structure(path)
-        HTMLExporter.export(structure, output_file)
+        from .exporters import HTMLExporter
+        if self.collect_usage:
+            usage = self.disk_usage(path)
+            HTMLExporter.export(usage.structure, output_file, usage)
+        else:
+            HTMLExporter.export(self._entries(path), output_file)
     
     def export_json(self, path: str, output_file: str) -> None:
         """Export structure as JSON"""
-        structure = self.get_structure(path)
-        JSONExporter.export(structure, output_file)
+        from .exporters import JSONExporter
+        if self.collect_usage:
+            usage = self.disk_usage(path)
+            JSONExporter.export(usage.structure, output_file, usage)
+        else:
+            JSONExporter.export(self._entries(path), output_file)
     
     def export_text(self, path: str, output_file: str) -> None:
         """Export structure as text file"""
-        structure = self.get_structure(path)
-        TextExporter.export(structure, output_file) 
\ No newline at end of file
+        from .exporters import TextExporter
+        if self.collect_usage:
+            usage = self.disk_usage(path)
+            TextExporter.export(usage.structure, output_file, usage)
+        else:
+            TextExporter.export(self._entries(path), output_file)
+    
+    def export_ndjson(self, path: str, output_file: str, stat: bool = False,
+                      batch_size: Optional[int] = None) -> None:
+        """Export one JSON record per line, written while the scan runs.
+
+        Lines are written batch_size records at a time (NDJSONExporter's
+        BATCH_SIZE by default); smaller batches reach a reader sooner.
+        """
+        from .exporters import BATCH_SIZE, NDJSONExporter
+        NDJSONExporter.export(self._entries(path), output_file, stat=stat,
+                              batch_size=BATCH_SIZE if batch_size is None else batch_size)
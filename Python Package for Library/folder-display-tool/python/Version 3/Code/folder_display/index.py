@@ -0,0 +1,196 @@
+import fnmatch
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Set
+
+from .scanner import ROOT_ID, Entry, iter_structure
+
+SEARCH_MODES = ('substring', 'glob', 'regex')
+
+# Glob syntax that cannot appear in the literal runs used to narrow a search
+_GLOB_CLASS = re.compile(r'\[[^\]]*\]')
+_GLOB_SPECIAL = re.compile(r'[*?\x00]')
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """Search index over the names of scanned entries.
+
+    Every distinct name is stored once, lower-cased, with trigram
+    postings (trigram -> ids of the names containing it). A substring
+    query intersects the postings of its trigrams, so only names that
+    contain every trigram are compared; glob queries use the trigrams of
+    their literal runs, or a bisect over the sorted names when the glob
+    starts with a literal. Regex queries cannot be narrowed and test
+    every distinct name once, which is still far fewer than the entries.
+
+    Entries are kept as parent links, and matching paths are rebuilt
+    only for the results. Queries are case-insensitive unless asked.
+    """
+
+    def __init__(self, path: str = ''):
+        self.path = path
+        # Per entry, indexed by id (0 is the scanned folder itself)
+        self._parents = array('I', [ROOT_ID])
+        self._entry_names = array('I', [0])
+        self._is_dir = bytearray(b'\x01')
+        # Entries sharing a name are chained: first entry per name, then next per entry
+        self._next_same = array('I', [0])
+        self._first = array('I')
+        self._names: List[str] = []
+        self._folded: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._sorted: Optional[List[str]] = None
+        self._sorted_ids: List[int] = []
+
+    def __len__(self) -> int:
+        """Number of indexed entries, not counting the scanned folder"""
+        return len(self._parents) - 1
+
+    def add(self, entry: Entry) -> None:
+        """Index one entry; ids must arrive in order, starting at 1"""
+        name_id = self._name_ids.get(entry.name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._name_ids[entry.name] = name_id
+            self._names.append(entry.name)
+            folded = entry.name.lower()
+            self._folded.append(folded)
+            self._first.append(0)
+            for trigram in _trigrams(folded):
+                postings = self._postings.get(trigram)
+                if postings is None:
+                    self._postings[trigram] = array('I', [name_id])
+                else:
+                    postings.append(name_id)
+            self._sorted = None
+        entry_id = len(self._parents)
+        self._parents.append(entry.parent)
+        self._entry_names.append(name_id)
+        self._is_dir.append(entry.is_dir)
+        self._next_same.append(self._first[name_id])
+        self._first[name_id] = entry_id
+
+    def add_entries(self, entries: Iterable[Entry]) -> None:
+        """Index every entry of a scan stream"""
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Entry], path: str = '') -> 'NameIndex':
+        """Build an index from a scan stream such as FolderDisplay.iter_entries"""
+        index = cls(path)
+        index.add_entries(entries)
+        return index
+
+    @classmethod
+    def from_structure(cls, structure: Mapping, path: str = '') -> 'NameIndex':
+        """Build an index from a structure dictionary"""
+        return cls.from_entries(iter_structure(structure, path), path)
+
+    def _candidates(self, literals: Iterable[str]) -> Optional[Iterable[int]]:
+        """Ids of the names containing every trigram of the literals (None: all names)"""
+        trigrams: Set[str] = set()
+        for literal in literals:
+            trigrams |= _trigrams(literal)
+        if not trigrams:
+            return None
+        postings = []
+        for trigram in trigrams:
+            found = self._postings.get(trigram)
+            if found is None:
+                return ()
+            postings.append(found)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for found in postings[1:]:
+            candidates.intersection_update(found)
+            if not candidates:
+                break
+        return candidates
+
+    def _prefixed(self, prefix: str) -> List[int]:
+        """Ids of the names starting with a lower-cased prefix, via the sorted names"""
+        if self._sorted is None:
+            order = sorted(range(len(self._folded)), key=self._folded.__getitem__)
+            self._sorted = [self._folded[i] for i in order]
+            self._sorted_ids = order
+        ids = []
+        for slot in range(bisect_left(self._sorted, prefix), len(self._sorted)):
+            if not self._sorted[slot].startswith(prefix):
+                break
+            ids.append(self._sorted_ids[slot])
+        return ids
+
+    def _matching_names(self, query: str, mode: str, case_sensitive: bool) -> List[int]:
+        """Ids of the distinct names matching a query"""
+        folded = query.lower()
+        names = self._names if case_sensitive else self._folded
+        if mode == 'substring':
+            needle = query if case_sensitive else folded
+            candidates = self._candidates([folded])
+            if candidates is None:
+                candidates = range(len(names))
+            return [i for i in candidates if needle in names[i]]
+        if mode == 'glob':
+            pattern = re.compile(fnmatch.translate(query), 0 if case_sensitive else re.IGNORECASE)
+            literals = _GLOB_SPECIAL.split(_GLOB_CLASS.sub('\x00', folded))
+            if literals[0] and len(literals) > 1:
+                candidates: Optional[Iterable[int]] = self._prefixed(literals[0])
+            else:
+                candidates = self._candidates(literals)
+        elif mode == 'regex':
+            pattern = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+            candidates = None
+        else:
+            raise ValueError(f"unknown search mode {mode!r}, expected one of {SEARCH_MODES}")
+        if candidates is None:
+            candidates = range(len(names))
+        if mode == 'glob':
+            return [i for i in candidates if pattern.match(self._names[i])]
+        return [i for i in candidates if pattern.search(self._names[i])]
+
+    def search_ids(self, query: str, mode: str = 'substring', case_sensitive: bool = False,
+                   limit: Optional[int] = None) -> List[int]:
+        """Get the ids of matching entries in scan order.
+
+        mode is 'substring', 'glob' (the whole name must match, as with
+        fnmatch) or 'regex' (re.search on the name).
+        """
+        ids = []
+        for name_id in self._matching_names(query, mode, case_sensitive):
+            entry_id = self._first[name_id]
+            while entry_id:
+                ids.append(entry_id)
+                entry_id = self._next_same[entry_id]
+        ids.sort()
+        return ids[:limit] if limit is not None else ids
+
+    def search(self, query: str, mode: str = 'substring', case_sensitive: bool = False,
+               limit: Optional[int] = None) -> List[str]:
+        """Get the paths of matching entries in scan order"""
+        return [self.full_path(entry_id)
+                for entry_id in self.search_ids(query, mode, case_sensitive, limit)]
+
+    def name(self, entry_id: int) -> str:
+        """Get the name of an indexed entry"""
+        return self._names[self._entry_names[entry_id]]
+
+    def is_dir(self, entry_id: int) -> bool:
+        """Check whether an indexed entry is a folder"""
+        return bool(self._is_dir[entry_id])
+
+    def full_path(self, entry_id: int) -> str:
+        """Rebuild the path of an indexed entry from its parents"""
+        names = []
+        while entry_id != ROOT_ID:
+            names.append(self.name(entry_id))
+            entry_id = self._parents[entry_id]
+        return os.path.join(self.path, *reversed(names))
@@ -0,0 +1,107 @@
+import os
+from collections.abc import Mapping
+from typing import Dict, FrozenSet, Iterator, Optional, Tuple
+
+from .scanner import TRUNCATED_DEPTH, TRUNCATED_ENTRIES, Scanner
+
+
+class LazyNode(Mapping):
+    """Dictionary view of a folder that is listed on first access.
+
+    Behaves like the dicts returned by FolderDisplay.get_structure, but
+    nothing is read until a folder's names or children are asked for,
+    and then only that folder: opening three levels of a huge volume
+    costs three listings per opened folder instead of a full walk.
+    Subfolders are LazyNodes again, files map to None.
+
+    The scanner's filters apply. Symlink cycles are cut per branch: a
+    folder whose identity matches one of its ancestors, or that is a
+    second link to a folder already listed alongside it, is empty.
+    Call refresh() to list a folder again.
+
+    The scanner's limits apply as well: a folder at max_depth is empty
+    and a listing stops after max_entries_per_dir entries. reason then
+    says why, like TruncatedDir.reason.
+    """
+
+    def __init__(self, scanner: Scanner, path: str, root_dev: Optional[int] = None,
+                 ancestors: FrozenSet[Tuple[int, int]] = frozenset(), descend: bool = True,
+                 depth: int = 0):
+        self.scanner = scanner
+        self.path = path
+        self._root_dev = root_dev
+        self._ancestors = ancestors
+        self._descend = descend
+        # Depth of this folder's entries, as in Entry.depth
+        self._depth = depth
+        self._children: Optional[Dict[str, Optional['LazyNode']]] = None
+        self._reason: Optional[str] = None
+
+    @classmethod
+    def root(cls, scanner: Scanner, path: str) -> 'LazyNode':
+        """Lazy view of a folder to be scanned"""
+        root_dev, _ = scanner._start(path)
+        return cls(scanner, path, root_dev)
+
+    def __repr__(self) -> str:
+        state = f"{len(self._children)} entries" if self._children is not None else "not listed"
+        return f"LazyNode({self.path!r}, {state})"
+
+    @property
+    def loaded(self) -> bool:
+        """Whether this folder has been listed"""
+        return self._children is not None
+
+    @property
+    def reason(self) -> Optional[str]:
+        """TRUNCATED_DEPTH or TRUNCATED_ENTRIES if a scan limit cut this folder short (lists it)"""
+        self._load()
+        return self._reason
+
+    def _load(self) -> Dict[str, Optional['LazyNode']]:
+        if self._children is not None:
+            return self._children
+        children: Dict[str, Optional[LazyNode]] = {}
+        self._children = children
+        self._reason = None
+        if not self._descend:
+            return children
+        scanner = self.scanner
+        if scanner._at_max_depth(self._depth):
+            self._reason = TRUNCATED_DEPTH
+            return children
+        ancestors = self._ancestors
+        visited = set(ancestors)
+        if scanner._needs_identity():
+            st = os.stat(self.path)
+            key = (st.st_dev, st.st_ino)
+            if key in ancestors:
+                return children
+            ancestors = ancestors | {key}
+            if scanner.cache is None:
+                # With a cache the listing marks the folder itself
+                visited.add(key)
+        listing, truncated = scanner._limited_listing(self.path, self._root_dev, visited)
+        if truncated:
+            self._reason = TRUNCATED_ENTRIES
+        depth = self._depth + 1
+        for name, entry_path, is_dir, descend in listing:
+            children[name] = (LazyNode(scanner, entry_path, self._root_dev, ancestors, descend, depth)
+                              if is_dir else None)
+        return children
+
+    def refresh(self) -> None:
+        """Forget the listing so the next access reads the folder again"""
+        self._children = None
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __getitem__(self, name: str) -> Optional['LazyNode']:
+        return self._load()[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._load()
@@ -0,0 +1,199 @@
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import ScanCache
+from .exclude import PathFilter
+from .scanner import Scanner
+from .stats import ScanStats
+
+# Separator for packed entry names; NUL cannot appear in a file name
+_NAME_SEP = '\x00'
+# Child count recorded for a file in a packed structure
+_FILE = -1
+
+
+class ThreadedScanner(Scanner):
+    """Scanner that lists directories concurrently on a thread pool.
+
+    Every directory listing is a separate task; a task submits one new
+    task per subdirectory it finds, so idle workers pick up whatever
+    directory is queued next. Directory reads release the GIL, which lets
+    listings on high-latency storage (NFS, FUSE) overlap.
+
+    Each directory is listed by exactly one task into the dict its parent
+    created for it, so entries keep their listing order and the result
+    is identical to a sequential scan. The one exception is a directory
+    reachable twice through symlinks: which copy is expanded depends on
+    which listing reaches it first.
+    """
+
+    def __init__(self, excluded_folders: Iterable[str] = (), include_hidden: bool = False,
+                 follow_symlinks: bool = True, same_filesystem: bool = False,
+                 cache: Optional[ScanCache] = None, exclude: Optional[PathFilter] = None,
+                 workers: int = 8, stats: Optional[ScanStats] = None, ignore_errors: bool = False):
+        super().__init__(excluded_folders, include_hidden,
+                         follow_symlinks=follow_symlinks, same_filesystem=same_filesystem,
+                         cache=cache, exclude=exclude, stats=stats, ignore_errors=ignore_errors)
+        self.workers = workers
+        self._visited_lock = threading.Lock()
+
+    def _mark_visited(self, key: Tuple[int, int], visited: Set[Tuple[int, int]]) -> bool:
+        """Record a directory identity, returning False if it was already seen"""
+        with self._visited_lock:
+            return super()._mark_visited(key, visited)
+
+    def scan(self, path: str) -> Dict:
+        """Get folder structure as a dictionary"""
+        structure: Dict = {}
+        root_dev, visited = self._start(path)
+        lock = threading.Lock()
+        finished = threading.Event()
+        errors = []
+        outstanding = [1]
+
+        def list_task(dir_path, node):
+            try:
+                if not errors:
+                    subdirs = self._list_dir(dir_path, node, root_dev, visited)
+                    with lock:
+                        outstanding[0] += len(subdirs)
+                    for subdir_path, child in subdirs:
+                        pool.submit(list_task, subdir_path, child)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                with lock:
+                    outstanding[0] -= 1
+                    if outstanding[0] == 0:
+                        finished.set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pool.submit(list_task, path, structure)
+            finished.wait()
+        if errors:
+            raise errors[0]
+        return structure
+
+
+def _pack_structure(structure: Dict) -> Tuple[str, bytes]:
+    """Flatten a structure into joined names plus preorder child counts.
+
+    Pickling one string and one byte buffer is far cheaper than pickling
+    a nested dict with one object per entry.
+    """
+    names: List[str] = []
+    counts = array('q')
+    stack = [iter(structure.items())]
+    while stack:
+        for name, contents in stack[-1]:
+            names.append(name)
+            if contents is None:
+                counts.append(_FILE)
+            else:
+                counts.append(len(contents))
+                stack.append(iter(contents.items()))
+                break
+        else:
+            stack.pop()
+    return _NAME_SEP.join(names), counts.tobytes()
+
+
+def _unpack_structure(packed: Tuple[str, bytes], node: Dict) -> None:
+    """Rebuild a structure made by _pack_structure into node"""
+    joined, raw_counts = packed
+    if not raw_counts:
+        return
+    counts = array('q')
+    counts.frombytes(raw_counts)
+    names = joined.split(_NAME_SEP)
+    # Each frame is [dict being filled, children still to read]
+    stack = [[node, -1]]
+    for name, count in zip(names, counts):
+        frame = stack[-1]
+        if count == _FILE:
+            frame[0][name] = None
+        else:
+            child: Dict = {}
+            frame[0][name] = child
+            if count:
+                stack.append([child, count])
+                continue
+        # Pop every frame whose children are now complete
+        while True:
+            frame = stack[-1]
+            frame[1] -= 1
+            if frame[1] != 0:
+                break
+            stack.pop()
+
+
+def _scan_shard(scanner: Scanner, path: str, root_dev: Optional[int],
+                visited: Set[Tuple[int, int]]) -> Tuple[str, bytes]:
+    """Scan one subtree in a worker process and return it packed"""
+    node: Dict = {}
+    scanner._walk(path, node, root_dev, visited)
+    return _pack_structure(node)
+
+
+class ProcessScanner(Scanner):
+    """Scanner that shards the tree across a process pool.
+
+    The parent process lists the top of the tree breadth-first until
+    there are several subtrees per worker, then each subtree is scanned
+    in its own process. Workers return their subtree packed into a
+    string and a byte buffer (see _pack_structure) and the parent
+    rebuilds it in place, so the result matches a sequential scan.
+
+    Cycle detection is per subtree: each worker starts from the
+    directories the parent already visited, so symlinks back up the tree
+    are cut, but a symlink into a sibling subtree may be listed twice.
+    A ScanCache is only used for the levels listed in the parent.
+    On platforms that spawn workers, call scan() under an
+    ``if __name__ == '__main__':`` guard.
+    """
+
+    # Subtrees to aim for per worker, so uneven subtrees even out
+    SHARDS_PER_WORKER = 4
+
+    def __init__(self, excluded_folders: Iterable[str] = (), include_hidden: bool = False,
+                 follow_symlinks: bool = True, same_filesystem: bool = False,
+                 cache: Optional[ScanCache] = None, exclude: Optional[PathFilter] = None,
+                 workers: int = 8, stats: Optional[ScanStats] = None, ignore_errors: bool = False):
+        super().__init__(excluded_folders, include_hidden,
+                         follow_symlinks=follow_symlinks, same_filesystem=same_filesystem,
+                         cache=cache, exclude=exclude, stats=stats, ignore_errors=ignore_errors)
+        self.workers = workers
+
+    def _split(self, path: str, structure: Dict, root_dev: Optional[int],
+               visited: Set[Tuple[int, int]]) -> List[Tuple[str, Dict]]:
+        """List the top of the tree until there are enough subtrees to hand out"""
+        target = self.workers * self.SHARDS_PER_WORKER
+        frontier = [(path, structure)]
+        while len(frontier) < target:
+            next_frontier = []
+            for dir_path, node in frontier:
+                next_frontier.extend(self._list_dir(dir_path, node, root_dev, visited))
+            if not next_frontier:
+                return []
+            frontier = next_frontier
+        return frontier
+
+    def scan(self, path: str) -> Dict:
+        """Get folder structure as a dictionary"""
+        structure: Dict = {}
+        root_dev, visited = self._start(path)
+        shards = self._split(path, structure, root_dev, visited)
+        if not shards:
+            return structure
+        shard_scanner = Scanner(self.excluded_folders, self.include_hidden,
+                                follow_symlinks=self.follow_symlinks,
+                                same_filesystem=self.same_filesystem,
+                                exclude=self.exclude, ignore_errors=self.ignore_errors)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [(node, pool.submit(_scan_shard, shard_scanner, dir_path, root_dev, visited))
+                       for dir_path, node in shards]
+            for node, future in futures:
+                _unpack_structure(future.result(), node)
+        return structure
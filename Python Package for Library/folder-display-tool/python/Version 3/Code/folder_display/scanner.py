@@ -0,0 +1,395 @@
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .cache import Listing, ScanCache
+from .exclude import DirRules, PathFilter
+from .stats import ScanStats
+
+# Parent id of the entries directly inside the scanned folder
+ROOT_ID = 0
+
+# Why a TruncatedDir was not fully listed
+TRUNCATED_DEPTH = 'depth'
+TRUNCATED_ENTRIES = 'entries'
+
+
+class Entry(NamedTuple):
+    """One file or folder yielded by a streaming scan"""
+    id: int
+    parent: int
+    depth: int
+    name: str
+    is_dir: bool
+    path: str
+    truncated: bool = False
+
+
+class TruncatedDir(dict):
+    """Folder in a structure that a scan limit stopped short.
+
+    reason is TRUNCATED_DEPTH when the folder lies at max_depth and was
+    not listed at all, or TRUNCATED_ENTRIES when only its first
+    max_entries_per_dir entries were kept.
+    """
+
+    __slots__ = ('reason',)
+
+    def __init__(self, reason: str):
+        super().__init__()
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"TruncatedDir({self.reason!r}, {dict.__repr__(self)})"
+
+
+def iter_structure(structure: Dict, path: str = '') -> Iterator[Entry]:
+    """Yield the entries of a structure dictionary depth-first"""
+    next_id = ROOT_ID + 1
+    stack = [(ROOT_ID, path, iter(structure.items()))]
+    while stack:
+        parent_id, parent_path, children = stack[-1]
+        depth = len(stack) - 1
+        for name, contents in children:
+            entry_id = next_id
+            next_id += 1
+            entry_path = os.path.join(parent_path, name)
+            yield Entry(entry_id, parent_id, depth, name, contents is not None, entry_path,
+                        isinstance(contents, TruncatedDir))
+            if contents:
+                stack.append((entry_id, entry_path, iter(contents.items())))
+                break
+        else:
+            stack.pop()
+
+
+class Scanner:
+    """Directory traversal engine built on os.scandir.
+
+    Entry types come from the cached d_type of each DirEntry, so a plain
+    listing costs one getdents pass per directory and no per-file stat.
+    Only symlinks (and filesystems that do not report d_type) fall back
+    to a stat call.
+
+    The walk uses an explicit stack, so its Python stack depth does not
+    grow with the depth of the tree. When symlinks are followed (the
+    default), every directory is identified by (st_dev, st_ino) and
+    entered at most once, which breaks symlink cycles. That identity
+    costs one stat call per directory (never per file); pass
+    follow_symlinks=False, without same_filesystem, for a walk that makes
+    no stat calls at all. A directory that is not descended into
+    (already visited, or on another filesystem with same_filesystem set)
+    is kept in the structure as an empty dict.
+
+    With a ScanCache, each directory is stat'ed before it is listed and
+    its listing is reused while its mtime and inode are unchanged. The
+    visited and same-filesystem checks then happen on that stat instead
+    of on the parent's entry.
+
+    A PathFilter passed as ``exclude`` is consulted once per entry, after
+    the cheaper hidden-name and excluded_folders checks; folders it
+    excludes are never listed.
+
+    max_depth limits how many levels of entries are listed (1 lists the
+    folder itself only) and max_entries_per_dir how many entries are
+    read from each folder. Folders cut short by either are TruncatedDir
+    in scan() results and have ``truncated`` set in iter_entries().
+
+    A folder that cannot be listed raises OSError unless ignore_errors
+    is set, in which case it is kept empty and the scan goes on.
+
+    With a ScanStats passed as ``stats``, every directory listing is
+    timed and counted (see ScanStats); without one the only cost is a
+    None check per directory. Profiling never changes what a scan
+    returns or raises.
+    """
+
+    def __init__(self, excluded_folders: Iterable[str] = (), include_hidden: bool = False,
+                 follow_symlinks: bool = True, same_filesystem: bool = False,
+                 cache: Optional[ScanCache] = None, exclude: Optional[PathFilter] = None,
+                 max_depth: Optional[int] = None, max_entries_per_dir: Optional[int] = None,
+                 stats: Optional[ScanStats] = None, ignore_errors: bool = False):
+        self.excluded_folders = set(excluded_folders)
+        self.include_hidden = include_hidden
+        self.follow_symlinks = follow_symlinks
+        self.same_filesystem = same_filesystem
+        self.cache = cache
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.max_entries_per_dir = max_entries_per_dir
+        self.stats = stats
+        self.ignore_errors = ignore_errors
+
+    def _is_skipped(self, name: str) -> bool:
+        """Check whether an entry name is filtered out by the scan options"""
+        if not self.include_hidden and name.startswith('.'):
+            return True
+        return name in self.excluded_folders
+
+    def _rules_for(self, dir_path: str) -> Optional[DirRules]:
+        """Get the exclusion rules for the entries of a directory, if any apply"""
+        if self.exclude is None:
+            return None
+        return self.exclude.rules_for(dir_path)
+
+    def _needs_identity(self) -> bool:
+        """Whether directories must be stat'ed to get their device and inode"""
+        return self.follow_symlinks or self.same_filesystem
+
+    def _start(self, path: str, new_scan: bool = True) -> Tuple[Optional[int], Set[Tuple[int, int]]]:
+        """Get the root device and the initial visited set for a scan.
+
+        new_scan=False lists a folder inside an earlier scan's root without
+        re-anchoring the exclusion patterns at it.
+        """
+        if new_scan and self.exclude is not None:
+            self.exclude.start(path)
+        if new_scan and self.stats is not None:
+            self.stats.reset(self.cache)
+        visited: Set[Tuple[int, int]] = set()
+        if not self._needs_identity():
+            return None, visited
+        st = os.stat(path)
+        if self.cache is None:
+            # With a cache the root is marked when it is listed
+            visited.add((st.st_dev, st.st_ino))
+        return st.st_dev, visited
+
+    def _mark_visited(self, key: Tuple[int, int], visited: Set[Tuple[int, int]]) -> bool:
+        """Record a directory identity, returning False if it was already seen"""
+        if key in visited:
+            return False
+        visited.add(key)
+        return True
+
+    def _should_descend(self, entry: os.DirEntry, root_dev: Optional[int],
+                        visited: Set[Tuple[int, int]]) -> bool:
+        """Decide whether to list a directory entry, recording it as visited"""
+        try:
+            st = entry.stat(follow_symlinks=self.follow_symlinks)
+        except OSError:
+            return False
+        if self.same_filesystem and st.st_dev != root_dev:
+            return False
+        return self._mark_visited((st.st_dev, st.st_ino), visited)
+
+    def _cached_listing(self, dir_path: str, root_dev: Optional[int],
+                        visited: Set[Tuple[int, int]]) -> Optional[Listing]:
+        """List a directory through the cache, or get None if it must be skipped"""
+        st = os.stat(dir_path)
+        if self.same_filesystem and st.st_dev != root_dev:
+            return None
+        if self._needs_identity() and not self._mark_visited((st.st_dev, st.st_ino), visited):
+            return None
+        listing = self.cache.lookup(dir_path, self.follow_symlinks, st)
+        if listing is None:
+            with os.scandir(dir_path) as entries:
+                listing = [(entry.name, entry.is_dir(follow_symlinks=self.follow_symlinks))
+                           for entry in entries]
+            self.cache.store(dir_path, self.follow_symlinks, st, listing)
+        return listing
+
+    def _syscalls(self, children: Iterable[Tuple[str, str, bool, bool]], misses: int) -> int:
+        """Count the scandir and stat calls a listing took, for ScanStats"""
+        if self.cache is not None:
+            # One stat of the directory, plus the listing on a cache miss
+            return 1 + (self.cache.misses - misses)
+        if not self._needs_identity():
+            return 1
+        return 1 + sum(1 for child in children if child[2])
+
+    def _read_dir(self, dir_path: str, root_dev: Optional[int], visited: Set[Tuple[int, int]],
+                  limit: Optional[int] = None) -> List[Tuple[str, str, bool, bool]]:
+        """List one directory as (name, path, is_dir, descend) tuples.
+
+        With a limit, reading stops after limit + 1 entries, so a longer
+        result means the directory has more.
+        """
+        if self.stats is None and not self.ignore_errors:
+            return list(self._iter_listing(dir_path, root_dev, visited, limit))
+        started = time.perf_counter()
+        misses = self.cache.misses if self.cache is not None else 0
+        error = None
+        try:
+            children = list(self._iter_listing(dir_path, root_dev, visited, limit))
+        except OSError as e:
+            children, error = [], e
+        if self.stats is not None:
+            self.stats.record(dir_path, len(children), sum(1 for child in children if child[3]),
+                              time.perf_counter() - started, self._syscalls(children, misses), error)
+        if error is not None and not self.ignore_errors:
+            raise error
+        return children
+
+    def _iter_listing(self, dir_path: str, root_dev: Optional[int], visited: Set[Tuple[int, int]],
+                      limit: Optional[int] = None) -> Iterator[Tuple[str, str, bool, bool]]:
+        """Yield the (name, path, is_dir, descend) entries of a directory that pass the filters.
+
+        The one place where listings are read and filtered; _read_dir
+        wraps it with the stats and error handling.
+        """
+        rules = self._rules_for(dir_path)
+        count = 0
+        if self.cache is not None:
+            for name, is_dir in self._cached_listing(dir_path, root_dev, visited) or ():
+                if self._is_skipped(name) or (rules is not None and rules.excludes(name, is_dir)):
+                    continue
+                yield name, os.path.join(dir_path, name), is_dir, is_dir
+                count += 1
+                if limit is not None and count > limit:
+                    return
+            return
+        needs_identity = self._needs_identity()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if self._is_skipped(name):
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                if rules is not None and rules.excludes(name, is_dir):
+                    continue
+                if is_dir:
+                    descend = not needs_identity or self._should_descend(entry, root_dev, visited)
+                    yield name, entry.path, True, descend
+                else:
+                    yield name, entry.path, False, False
+                count += 1
+                if limit is not None and count > limit:
+                    return
+
+    def _has_limits(self) -> bool:
+        return self.max_depth is not None or self.max_entries_per_dir is not None
+
+    def _limited_listing(self, dir_path: str, root_dev: Optional[int],
+                         visited: Set[Tuple[int, int]]) -> Tuple[List[Tuple[str, str, bool, bool]], bool]:
+        """List a directory up to max_entries_per_dir, also returning whether it was cut"""
+        limit = self.max_entries_per_dir
+        children = self._read_dir(dir_path, root_dev, visited, limit)
+        if limit is not None and len(children) > limit:
+            return children[:limit], True
+        return children, False
+
+    def _at_max_depth(self, depth: int) -> bool:
+        """Whether entries at this depth are beyond max_depth"""
+        return self.max_depth is not None and depth >= self.max_depth
+
+    def _list_dir(self, dir_path: str, node: Dict, root_dev: Optional[int],
+                  visited: Set[Tuple[int, int]]) -> List[Tuple[str, Dict]]:
+        """List one directory into node and return the subdirectories to descend into"""
+        subdirs = []
+        for name, entry_path, is_dir, descend in self._read_dir(dir_path, root_dev, visited):
+            if is_dir:
+                child: Dict = {}
+                node[name] = child
+                if descend:
+                    subdirs.append((entry_path, child))
+            else:
+                node[name] = None
+        return subdirs
+
+    def _walk(self, path: str, node: Dict, root_dev: Optional[int],
+              visited: Set[Tuple[int, int]]) -> None:
+        """List path and everything below it into node"""
+        stack = [(path, node)]
+        while stack:
+            dir_path, dir_node = stack.pop()
+            # Reversed so directories are listed in the same order as iter_entries
+            stack.extend(reversed(self._list_dir(dir_path, dir_node, root_dev, visited)))
+
+    def _scan_limited(self, path: str, root_dev: Optional[int],
+                      visited: Set[Tuple[int, int]]) -> Dict:
+        """Build the structure within max_depth and max_entries_per_dir.
+
+        A folder's dict is created after it is listed, so it can be a
+        TruncatedDir; its parent holds a placeholder in the same position
+        until then.
+        """
+        if self._at_max_depth(0):
+            return TruncatedDir(TRUNCATED_DEPTH)
+        holder: Dict = {}
+        # (folder path, parent dict, name in parent, depth of the folder's entries)
+        stack = [(path, holder, '', 0)]
+        while stack:
+            dir_path, parent, dir_name, depth = stack.pop()
+            children, truncated = self._limited_listing(dir_path, root_dev, visited)
+            node: Dict = TruncatedDir(TRUNCATED_ENTRIES) if truncated else {}
+            parent[dir_name] = node
+            subdirs = []
+            for name, entry_path, is_dir, descend in children:
+                if not is_dir:
+                    node[name] = None
+                elif descend and self._at_max_depth(depth + 1):
+                    node[name] = TruncatedDir(TRUNCATED_DEPTH)
+                else:
+                    node[name] = {}
+                    if descend:
+                        subdirs.append((entry_path, node, name, depth + 1))
+            stack.extend(reversed(subdirs))
+        return holder['']
+
+    def scan(self, path: str) -> Dict:
+        """Get folder structure as a dictionary"""
+        root_dev, visited = self._start(path)
+        if self._has_limits():
+            return self._scan_limited(path, root_dev, visited)
+        structure: Dict = {}
+        self._walk(path, structure, root_dev, visited)
+        return structure
+
+    def iter_entries(self, path: str) -> Iterator[Entry]:
+        """Yield entries depth-first without building the whole structure.
+
+        Only the listings of the directories on the current branch are held
+        in memory, and each directory is read when the walk reaches it.
+        """
+        root_dev, visited = self._start(path)
+        if self._has_limits():
+            return self._iter_limited(path, root_dev, visited)
+        return self._iter_all(path, root_dev, visited)
+
+    def _iter_all(self, path: str, root_dev: Optional[int],
+                  visited: Set[Tuple[int, int]]) -> Iterator[Entry]:
+        """iter_entries without limits"""
+        next_id = ROOT_ID + 1
+        stack = [(ROOT_ID, iter(self._read_dir(path, root_dev, visited)))]
+        while stack:
+            parent_id, children = stack[-1]
+            depth = len(stack) - 1
+            for name, entry_path, is_dir, descend in children:
+                entry_id = next_id
+                next_id += 1
+                yield Entry(entry_id, parent_id, depth, name, is_dir, entry_path)
+                if descend:
+                    stack.append((entry_id, iter(self._read_dir(entry_path, root_dev, visited))))
+                    break
+            else:
+                stack.pop()
+
+    def _iter_limited(self, path: str, root_dev: Optional[int],
+                      visited: Set[Tuple[int, int]]) -> Iterator[Entry]:
+        """iter_entries within max_depth and max_entries_per_dir.
+
+        A folder is listed before its entry is yielded, so the entry can
+        say whether the listing was cut short.
+        """
+        if self._at_max_depth(0):
+            return
+        next_id = ROOT_ID + 1
+        stack = [(ROOT_ID, iter(self._limited_listing(path, root_dev, visited)[0]))]
+        while stack:
+            parent_id, children = stack[-1]
+            depth = len(stack) - 1
+            for name, entry_path, is_dir, descend in children:
+                entry_id = next_id
+                next_id += 1
+                if not descend:
+                    yield Entry(entry_id, parent_id, depth, name, is_dir, entry_path)
+                elif self._at_max_depth(depth + 1):
+                    yield Entry(entry_id, parent_id, depth, name, True, entry_path, True)
+                else:
+                    listing, truncated = self._limited_listing(entry_path, root_dev, visited)
+                    yield Entry(entry_id, parent_id, depth, name, True, entry_path, truncated)
+                    stack.append((entry_id, iter(listing)))
+                    break
+            else:
+                stack.pop()
@@ -0,0 +1,118 @@
+import io
+import os
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from .binary import read_tree, write_tree
+from .compact import CompactNode, CompactTree
+from .diff import AnyStamps, DiffEntry, StampColumns, diff_structures
+from .exporters import HTMLExporter, JSONExporter, NDJSONExporter, Output, TextExporter
+from .scanner import Entry, iter_structure
+
+
+class Snapshot:
+    """The result of one scan, renderable in any format without rescanning.
+
+    Returned by FolderDisplay.snapshot. Each to_* method writes to a path
+    or writable when given one and returns the text otherwise. stamps,
+    when recorded, let diff skip unchanged subtrees.
+    """
+
+    def __init__(self, path: str, structure: Dict, options: Dict,
+                 created: Optional[datetime] = None, stamps: Optional[AnyStamps] = None):
+        self.path = path
+        self.structure = structure
+        self.options = options
+        self.created = created or datetime.now()
+        self.stamps = stamps
+
+    def __repr__(self) -> str:
+        return f"Snapshot({self.path!r}, created={self.created.isoformat()})"
+
+    def save(self, output_file: str, compress: Optional[str] = None) -> None:
+        """Write the snapshot to a compact binary file.
+
+        compress is None, 'zlib' or 'lzma'; uncompressed files load
+        fastest since they are memory-mapped. Truncated folders are
+        saved as plain folders.
+        """
+        structure = self.structure
+        if isinstance(structure, CompactNode) and structure.index == 0:
+            tree = structure.tree
+        else:
+            tree = CompactTree.from_structure(structure, self.path)
+        stamps = self.stamps
+        if stamps is not None and not (isinstance(stamps, StampColumns) and stamps.tree is tree):
+            stamps = StampColumns.from_stamps(tree, stamps)
+        meta = {
+            'path': self.path,
+            'options': self.options,
+            'created': self.created.timestamp(),
+        }
+        write_tree(tree, meta, output_file, compress, stamps)
+
+    @classmethod
+    def load(cls, input_file: str) -> 'Snapshot':
+        """Load a snapshot written by save without reading the whole file.
+
+        The structure is a read-only CompactTree view and the stamps, if
+        saved, are StampColumns; both are read from the file as folders
+        are visited.
+        """
+        tree, meta, stamps = read_tree(input_file)
+        return cls(meta['path'], tree.root, meta.get('options', {}),
+                   datetime.fromtimestamp(meta['created']), stamps)
+
+    def subtree(self, rel_path: str) -> Mapping:
+        """Get the structure of a folder inside the snapshot, given its path relative to the root"""
+        node = self.structure
+        for name in rel_path.replace(os.sep, '/').split('/'):
+            if name:
+                node = node[name]
+                if node is None:
+                    raise NotADirectoryError(rel_path)
+        return node
+
+    def entries(self) -> Iterator[Entry]:
+        """Yield the snapshot's entries depth-first"""
+        return iter_structure(self.structure, self.path)
+
+    def diff(self, newer: 'Snapshot') -> List[DiffEntry]:
+        """List the entries added, removed or changed in a later snapshot of the same folder"""
+        return diff_structures(self.structure, newer.structure, self.path, self.stamps, newer.stamps)
+
+    def render(self, indent: str = "    ") -> str:
+        """Format the snapshot like FolderDisplay.display"""
+        return "\n".join(indent * entry.depth + "├── " + entry.name + (" ..." if entry.truncated else "")
+                         for entry in self.entries())
+
+    def _export(self, exporter, output_file: Optional[Output]) -> Optional[str]:
+        """Run an exporter on the snapshot, returning the text if no output is given"""
+        if output_file is not None:
+            exporter.export(self.structure, output_file)
+            return None
+        buffer = io.StringIO()
+        exporter.export(self.structure, buffer)
+        return buffer.getvalue()
+
+    def to_text(self, output_file: Optional[Output] = None) -> Optional[str]:
+        """Export the snapshot as text"""
+        return self._export(TextExporter, output_file)
+
+    def to_html(self, output_file: Optional[Output] = None) -> Optional[str]:
+        """Export the snapshot as HTML"""
+        return self._export(HTMLExporter, output_file)
+
+    def to_json(self, output_file: Optional[Output] = None) -> Optional[str]:
+        """Export the snapshot as JSON"""
+        return self._export(JSONExporter, output_file)
+
+    def to_ndjson(self, output_file: Optional[Output] = None) -> Optional[str]:
+        """Export the snapshot as JSON Lines, one record per entry"""
+        if output_file is not None:
+            NDJSONExporter.export(self.structure, output_file, self.path)
+            return None
+        buffer = io.StringIO()
+        NDJSONExporter.export(self.structure, buffer, self.path)
+        return buffer.getvalue()
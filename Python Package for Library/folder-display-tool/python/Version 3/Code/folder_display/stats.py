@@ -0,0 +1,138 @@
+import errno
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .cache import ScanCache
+
+# Error kinds counted by ScanStats
+PERMISSION_DENIED = 'permission_denied'
+VANISHED = 'vanished'
+OTHER = 'other'
+
+
+def error_kind(error: OSError) -> str:
+    """Classify a listing error as PERMISSION_DENIED, VANISHED or OTHER"""
+    if error.errno in (errno.EACCES, errno.EPERM):
+        return PERMISSION_DENIED
+    if error.errno in (errno.ENOENT, errno.ENOTDIR):
+        return VANISHED
+    return OTHER
+
+
+class DirStats(NamedTuple):
+    """What listing one directory cost, as passed to the ScanStats callback"""
+    path: str
+    entries: int
+    seconds: float
+    syscalls: int
+    error: Optional[OSError] = None
+
+
+class ScanStats:
+    """Counters filled in by a Scanner while it lists directories.
+
+    Pass to a Scanner as ``stats`` (or set FolderDisplay.set_stats) to
+    collect directories, entries, system calls, time spent listing, errors
+    by kind, the slowest directories and the peak frontier: the most
+    directories found but not yet listed at any one time. syscalls counts
+    the os.scandir and stat calls the scanner makes, not the getdents
+    calls inside one listing. A callback, if given, is called with a
+    DirStats after every directory, on the thread that listed it.
+
+    A directory that cannot be listed is recorded as an error before the
+    scan raises it; set the scanner's ignore_errors to keep such folders
+    empty and profile the whole tree. Process-parallel scans only measure
+    the levels listed in the parent process.
+    """
+
+    def __init__(self, slowest: int = 10, callback: Optional[Callable[[DirStats], None]] = None,
+                 errors_kept: int = 1000):
+        self.slowest_kept = slowest
+        self.callback = callback
+        self.errors_kept = errors_kept
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, cache: Optional[ScanCache] = None) -> None:
+        """Zero every counter; the cache's hits and misses are counted from now on"""
+        self.dirs = 0
+        self.entries = 0
+        self.syscalls = 0
+        self.seconds = 0.0
+        self.error_counts: Dict[str, int] = {PERMISSION_DENIED: 0, VANISHED: 0, OTHER: 0}
+        self.errors: List[Tuple[str, str, str]] = []
+        self.frontier = 1
+        self.peak_frontier = 1
+        self.started = time.perf_counter()
+        self.finished = self.started
+        self._slowest: List[Tuple[float, int, str, int]] = []
+        self._cache = cache
+        self._cache_start = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    def record(self, path: str, entries: int, subdirs: int, seconds: float, syscalls: int,
+               error: Optional[OSError] = None) -> None:
+        """Account for one listed directory and the subdirectories it added to the frontier"""
+        with self._lock:
+            self.dirs += 1
+            self.entries += entries
+            self.syscalls += syscalls
+            self.seconds += seconds
+            self.frontier += subdirs - 1
+            if self.frontier > self.peak_frontier:
+                self.peak_frontier = self.frontier
+            if error is not None:
+                kind = error_kind(error)
+                self.error_counts[kind] += 1
+                if len(self.errors) < self.errors_kept:
+                    self.errors.append((path, kind, error.strerror or str(error)))
+            item = (seconds, self.dirs, path, entries)
+            if len(self._slowest) < self.slowest_kept:
+                heapq.heappush(self._slowest, item)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+            self.finished = time.perf_counter()
+        if self.callback is not None:
+            self.callback(DirStats(path, entries, seconds, syscalls, error))
+
+    def slowest(self) -> List[Tuple[str, float, int]]:
+        """Get (path, seconds, entries) of the slowest directories, slowest first"""
+        return [(path, seconds, entries)
+                for seconds, _, path, entries in sorted(self._slowest, reverse=True)]
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Get the ScanCache hits and misses since the last reset"""
+        if self._cache is None:
+            return {'hits': 0, 'misses': 0}
+        return {'hits': self._cache.hits - self._cache_start[0],
+                'misses': self._cache.misses - self._cache_start[1]}
+
+    def summary(self) -> str:
+        """One line for a status bar"""
+        errors = sum(self.error_counts.values())
+        return (f"{self.dirs} folders, {self.entries} entries, {errors} errors, "
+                f"{self.syscalls} syscalls, peak frontier {self.peak_frontier}")
+
+    def to_dict(self) -> Dict:
+        """Get every counter as a JSON-serializable profile"""
+        return {
+            'dirs': self.dirs,
+            'entries': self.entries,
+            'syscalls': self.syscalls,
+            'list_seconds': self.seconds,
+            'wall_seconds': self.finished - self.started,
+            'peak_frontier': self.peak_frontier,
+            'errors': dict(self.error_counts),
+            'error_paths': [{'path': path, 'kind': kind, 'message': message}
+                            for path, kind, message in self.errors],
+            'slowest': [{'path': path, 'seconds': seconds, 'entries': entries}
+                        for path, seconds, entries in self.slowest()],
+            'cache': self.cache_stats(),
+        }
+
+    def to_json(self, output_file: str) -> None:
+        """Write the profile to a JSON file"""
+        import json
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
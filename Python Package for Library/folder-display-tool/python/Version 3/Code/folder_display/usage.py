@@ -0,0 +1,169 @@
+import copy
+import os
+from array import array
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+from .scanner import ROOT_ID, TRUNCATED_DEPTH, TRUNCATED_ENTRIES, Scanner, TruncatedDir
+
+# Binary units for format_size, largest first
+_UNITS = (('TiB', 2**40), ('GiB', 2**30), ('MiB', 2**20), ('KiB', 2**10))
+
+
+class Usage(NamedTuple):
+    """Space used by one entry, including everything below a folder"""
+    size: int
+    blocks: int
+    files: int
+    dirs: int
+    mtime: float
+
+
+def format_size(size: int) -> str:
+    """Format a byte count with a binary unit, like du -h"""
+    for unit, scale in _UNITS:
+        if size >= scale:
+            return f"{size / scale:.1f} {unit}"
+    return f"{size} B"
+
+
+class DiskUsage:
+    """Sizes, counts and newest mtimes rolled up over a scanned structure.
+
+    Columns are indexed by entry id: the position of an entry in
+    iter_structure(structure) counting from 1, with 0 for the scanned
+    folder. size is the apparent size (st_size) and blocks the allocated
+    512-byte blocks (st_blocks, 0 where the platform has none); like du,
+    both include the folders themselves. A file with several hard links
+    adds its size and blocks once, at the first link seen, though every
+    link counts as a file; when symlinks are followed, so does anything
+    reached twice through a link. mtime is the newest modification time
+    in a folder's subtree.
+    """
+
+    def __init__(self, path: str, structure: Dict):
+        self.path = path
+        self.structure = structure
+        self.size = array('Q')
+        self.blocks = array('Q')
+        self.files = array('Q')
+        self.dirs = array('Q')
+        self.mtime = array('d')
+        self.is_dir = bytearray()
+
+    def __len__(self) -> int:
+        """Number of entries, counting the scanned folder"""
+        return len(self.size)
+
+    def usage(self, entry_id: int = ROOT_ID) -> Usage:
+        """Get the usage of an entry (the scanned folder by default)"""
+        return Usage(self.size[entry_id], self.blocks[entry_id], self.files[entry_id],
+                     self.dirs[entry_id], self.mtime[entry_id])
+
+    def label(self, entry_id: int) -> str:
+        """Short description of an entry's usage, as shown by the text and HTML exports"""
+        size = format_size(self.size[entry_id])
+        if not self.is_dir[entry_id]:
+            return size
+        files = self.files[entry_id]
+        return f"{size}, {files} file{'' if files == 1 else 's'}"
+
+
+def scan_usage(scanner: Scanner, path: str) -> DiskUsage:
+    """Scan a folder and collect its usage in the same depth-first pass.
+
+    Every entry is stat'ed once, following symlinks when the scanner
+    does. A folder's totals are added to its parent as soon as its last
+    entry has been seen, so the rollup needs no second walk.
+
+    Like du -d, a max_depth only limits what is listed: the whole tree
+    is still read, and folders at the limit (TruncatedDir) total
+    everything below them. Folders cut by max_entries_per_dir only
+    total the entries that were read.
+    """
+    structure: Dict = {}
+    du = DiskUsage(path, structure)
+    follow = scanner.follow_symlinks
+    max_depth = scanner.max_depth
+    if max_depth is not None:
+        scanner = copy.copy(scanner)
+        scanner.max_depth = None
+    seen_links: Set[Tuple[int, int]] = set()
+    size, blocks, files, dirs, mtime = du.size, du.blocks, du.files, du.dirs, du.mtime
+
+    def stat(entry_path: str, is_dir: bool) -> Tuple[Optional[os.stat_result], bool]:
+        """Stat an entry, also returning whether its size still has to be counted"""
+        try:
+            st = os.stat(entry_path, follow_symlinks=follow)
+        except OSError:
+            try:
+                # A dangling symlink still takes up its own inode
+                st = os.stat(entry_path, follow_symlinks=False)
+            except OSError:
+                return None, False
+        if follow or (not is_dir and st.st_nlink > 1):
+            key = (st.st_dev, st.st_ino)
+            if key in seen_links:
+                return st, False
+            seen_links.add(key)
+        return st, True
+
+    def record(entry_path: str, is_dir: bool) -> None:
+        st, counted = stat(entry_path, is_dir)
+        size.append(st.st_size if counted else 0)
+        blocks.append(getattr(st, 'st_blocks', 0) if counted else 0)
+        files.append(0 if is_dir else 1)
+        dirs.append(0)
+        mtime.append(st.st_mtime if st is not None else 0.0)
+        du.is_dir.append(is_dir)
+
+    def add_below(entry_path: str, is_dir: bool, parent: int) -> None:
+        """Add an entry past max_depth straight to the listed folder holding it"""
+        st, counted = stat(entry_path, is_dir)
+        if counted:
+            size[parent] += st.st_size
+            blocks[parent] += getattr(st, 'st_blocks', 0)
+        if is_dir:
+            dirs[parent] += 1
+        else:
+            files[parent] += 1
+        if st is not None and st.st_mtime > mtime[parent]:
+            mtime[parent] = st.st_mtime
+
+    def roll_up(child: int, parent: int) -> None:
+        size[parent] += size[child]
+        blocks[parent] += blocks[child]
+        files[parent] += files[child]
+        dirs[parent] += dirs[child] + du.is_dir[child]
+        if mtime[child] > mtime[parent]:
+            mtime[parent] = mtime[child]
+
+    record(path, True)
+    # branch[d] is the (id, dict) of the open folder holding entries at depth d
+    branch = [(ROOT_ID, structure)]
+    for entry in scanner.iter_entries(path):
+        while len(branch) > entry.depth + 1:
+            finished, _ = branch.pop()
+            roll_up(finished, branch[-1][0])
+        parent_id, node = branch[-1]
+        if max_depth is not None and entry.depth >= max_depth:
+            add_below(entry.path, entry.is_dir, parent_id)
+            continue
+        record(entry.path, entry.is_dir)
+        # Column of the entry: entries past max_depth have none, so not always entry.id
+        entry_id = len(size) - 1
+        if entry.is_dir:
+            if max_depth is not None and entry.depth + 1 >= max_depth:
+                child: Dict = TruncatedDir(TRUNCATED_DEPTH)
+            elif entry.truncated:
+                child = TruncatedDir(TRUNCATED_ENTRIES)
+            else:
+                child = {}
+            node[entry.name] = child
+            branch.append((entry_id, child))
+        else:
+            node[entry.name] = None
+            roll_up(entry_id, parent_id)
+    while len(branch) > 1:
+        finished, _ = branch.pop()
+        roll_up(finished, branch[-1][0])
+    return du
@@ -0,0 +1,308 @@
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .scanner import Scanner
+
+# inotify event masks, from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+               | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct('iIII')
+
+
+class Change(NamedTuple):
+    """One update applied to a watched structure.
+
+    kind is 'added', 'removed', 'moved' (old_path is set), 'rescanned'
+    after the kernel queue overflowed and the whole tree was read again,
+    or 'unwatched' for a folder that was listed but could not be watched
+    because the inotify watch limit was reached; later changes inside it
+    are missed.
+    """
+    kind: str
+    path: str
+    is_dir: bool
+    old_path: Optional[str] = None
+
+
+def _libc() -> ctypes.CDLL:
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.ENOSYS, "watch mode needs Linux inotify")
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+class Watcher:
+    """Folder structure kept current from inotify events (Linux only).
+
+    The folder is scanned once when the watcher is created, with one
+    inotify watch per directory. Afterwards each event is applied to
+    ``structure`` as a delta: created entries are added (new folders are
+    scanned), deleted ones removed, and renames move the existing subtree.
+    Subscribers are called with every Change from the thread that
+    processes events; hold ``lock`` while reading ``structure`` from
+    another thread.
+
+    Folders that cannot be read are kept empty and not watched. Each
+    watched directory uses one of the user's inotify watches
+    (fs.inotify.max_user_watches). Running out while the watcher is
+    created raises OSError; running out later is reported as an
+    'unwatched' Change for every folder that could not be watched, and
+    the watcher carries on.
+
+    Watches are tracked by watch descriptor. inotify returns the same
+    descriptor when a directory is watched again under a new path, so
+    the path recorded for a descriptor is always the latest one.
+    """
+
+    def __init__(self, scanner: Scanner, path: str):
+        self.scanner = scanner
+        self.path = path
+        self.structure: Dict = {}
+        self.lock = threading.RLock()
+        self._libc = _libc()
+        if not os.path.isdir(path):
+            raise FileNotFoundError(errno.ENOENT, "no such folder", path)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Path of the directory behind each watch descriptor
+        self._paths: Dict[int, str] = {}
+        self._subscribers: List[Callable[[Change], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r, self._wake_w = os.pipe()
+        unwatched = self._scan_into(path, self.structure)
+        if unwatched:
+            self.close()
+            raise OSError(errno.ENOSPC, f"inotify watch limit reached, {len(unwatched)} folders "
+                                        "not watched (raise fs.inotify.max_user_watches)")
+
+    def __enter__(self) -> 'Watcher':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def subscribe(self, callback: Callable[[Change], None]) -> None:
+        """Call callback with each change applied to the structure"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Change], None]) -> None:
+        """Stop calling a subscribed callback"""
+        self._subscribers.remove(callback)
+
+    def _add_watch(self, dir_path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"cannot watch {dir_path}: {os.strerror(err)}")
+        self._paths[wd] = dir_path
+
+    def _scan_into(self, path: str, node: Dict) -> List[str]:
+        """Watch and list a folder and everything below it into node.
+
+        Folders that cannot be read are left empty. Returns the folders
+        that were listed but not watched because the watch limit was hit.
+        """
+        unwatched = []
+        try:
+            root_dev, visited = self.scanner._start(path, new_scan=path == self.path)
+        except OSError:
+            return unwatched
+        stack = [(path, node)]
+        while stack:
+            dir_path, dir_node = stack.pop()
+            # Watch before listing so entries created meanwhile are not missed
+            try:
+                self._add_watch(dir_path)
+            except OSError as e:
+                if e.errno != errno.ENOSPC:
+                    # Unreadable, or removed again; a delete event follows for the latter
+                    continue
+                unwatched.append(dir_path)
+            try:
+                stack.extend(self.scanner._list_dir(dir_path, dir_node, root_dev, visited))
+            except OSError:
+                continue
+        return unwatched
+
+    def _node(self, dir_path: str) -> Optional[Dict]:
+        """Find the dict of a watched folder in the structure"""
+        node = self.structure
+        rel = os.path.relpath(dir_path, self.path)
+        if rel == os.curdir:
+            return node
+        for part in rel.split(os.sep):
+            node = node.get(part)
+            if not isinstance(node, dict):
+                return None
+        return node
+
+    def _watches_under(self, dir_path: str) -> List[Tuple[int, str]]:
+        """Get the (wd, path) watches currently recorded for a folder and its subfolders"""
+        prefix = dir_path + os.sep
+        return [(wd, watched) for wd, watched in self._paths.items()
+                if watched == dir_path or watched.startswith(prefix)]
+
+    def _forget(self, dir_path: str, unwatch: bool) -> None:
+        """Drop the watches of a folder and its subfolders.
+
+        A directory moved elsewhere in the tree and already watched again
+        keeps its descriptor under the new path, so it is not matched.
+        """
+        for wd, _ in self._watches_under(dir_path):
+            del self._paths[wd]
+            if unwatch:
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _rename_watches(self, old_path: str, new_path: str) -> None:
+        """Point the watches of a moved folder and its subfolders at the new path"""
+        for wd, watched in self._watches_under(old_path):
+            self._paths[wd] = new_path + watched[len(old_path):]
+
+    def _is_dir(self, path: str, mask: int) -> bool:
+        if mask & IN_ISDIR:
+            return True
+        return self.scanner.follow_symlinks and os.path.isdir(path)
+
+    def _add_entry(self, node: Dict, dir_path: str, name: str, mask: int) -> List[Change]:
+        path = os.path.join(dir_path, name)
+        if self._is_dir(path, mask):
+            child: Dict = {}
+            node[name] = child
+            unwatched = self._scan_into(path, child)
+            return [Change('added', path, True)] + [Change('unwatched', p, True) for p in unwatched]
+        node[name] = None
+        return [Change('added', path, False)]
+
+    def _rescan(self) -> List[Change]:
+        """Start over after the kernel dropped events"""
+        self._forget(self.path, unwatch=True)
+        self.structure.clear()
+        unwatched = self._scan_into(self.path, self.structure)
+        return [Change('rescanned', self.path, True)] + [Change('unwatched', p, True) for p in unwatched]
+
+    def _apply(self, events: List[Tuple[int, int, int, str]]) -> List[Change]:
+        """Apply one batch of events to the structure"""
+        changes = []
+        moved_out: Dict[int, Tuple[str, bool, Optional[Dict]]] = {}
+        for wd, mask, cookie, name in events:
+            if mask & IN_Q_OVERFLOW:
+                moved_out.clear()
+                changes.extend(self._rescan())
+                continue
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            dir_path = self._paths.get(wd)
+            if dir_path is None or not name or self.scanner._is_skipped(name):
+                continue
+            rules = self.scanner._rules_for(dir_path)
+            if rules is not None and rules.excludes(name, bool(mask & IN_ISDIR)):
+                continue
+            node = self._node(dir_path)
+            if node is None:
+                continue
+            path = os.path.join(dir_path, name)
+            if mask & IN_CREATE:
+                if name not in node:
+                    changes.extend(self._add_entry(node, dir_path, name, mask))
+            elif mask & IN_DELETE:
+                if name in node:
+                    node.pop(name)
+                    self._forget(path, unwatch=False)
+                    changes.append(Change('removed', path, bool(mask & IN_ISDIR)))
+            elif mask & IN_MOVED_FROM:
+                moved_out[cookie] = (path, bool(mask & IN_ISDIR), node.pop(name, None))
+            elif mask & IN_MOVED_TO:
+                source = moved_out.pop(cookie, None)
+                if source is None:
+                    changes.extend(self._add_entry(node, dir_path, name, mask))
+                    continue
+                old_path, is_dir, contents = source
+                node[name] = contents
+                if is_dir:
+                    self._rename_watches(old_path, path)
+                changes.append(Change('moved', path, is_dir, old_path))
+        # A move whose destination is outside the tree is a removal
+        for old_path, is_dir, _ in moved_out.values():
+            if is_dir:
+                self._forget(old_path, unwatch=True)
+            changes.append(Change('removed', old_path, is_dir))
+        return changes
+
+    def _read_events(self) -> List[Tuple[int, int, int, str]]:
+        events = []
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return events
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def poll(self, timeout: Optional[float] = None) -> List[Change]:
+        """Wait up to timeout seconds for events, apply them and notify subscribers"""
+        readable, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if self._fd not in readable:
+            return []
+        with self.lock:
+            changes = self._apply(self._read_events())
+        for change in changes:
+            for callback in list(self._subscribers):
+                callback(change)
+        return changes
+
+    def _run(self) -> None:
+        while self._thread is not None:
+            self.poll()
+
+    def start(self) -> None:
+        """Process events on a background thread until stop() is called"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="folder-display-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            os.write(self._wake_w, b'\0')
+            thread.join()
+            os.read(self._wake_r, 1)
+
+    def close(self) -> None:
+        """Stop watching and release the inotify descriptor"""
+        self.stop()
+        if self._fd >= 0:
+            os.close(self._fd)
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._fd = -1
@@ -0,0 +1,88 @@
+"""
+The 1.0.0 implementation of the scan, display and exporters, kept as the
+reference the current output must match byte for byte
+"""
+
+import json
+import os
+
+
+def get_structure(path, excluded_folders=(), include_hidden=False):
+    structure = {}
+    for item in os.listdir(path):
+        if not include_hidden and item.startswith('.'):
+            continue
+        if item in excluded_folders:
+            continue
+        full_path = os.path.join(path, item)
+        if os.path.isdir(full_path):
+            structure[item] = get_structure(full_path, excluded_folders, include_hidden)
+        else:
+            structure[item] = None
+    return structure
+
+
+def format_structure(structure, indent="    ", level=0):
+    output = []
+    for name, contents in structure.items():
+        output.append(indent * level + "├── " + name)
+        if contents:
+            output.append(format_structure(contents, indent, level + 1))
+    return "\n".join(output)
+
+
+def structure_to_html(structure):
+    html = "<ul>"
+    for name, contents in structure.items():
+        html += f"<li>{name}"
+        if contents:
+            html += structure_to_html(contents)
+        html += "</li>"
+    html += "</ul>"
+    return html
+
+
+def export_html(structure):
+    html = """
+        <html>
+        <head>
+            <style>
+                .tree ul {
+                    margin-left: 20px;
+                    padding-left: 0;
+                }
+                .tree li {
+                    list-style-type: none;
+                    margin: 10px;
+                    position: relative;
+                }
+                .tree li::before {
+                    content: "├── ";
+                    font-family: monospace;
+                }
+            </style>
+        </head>
+        <body>
+            <div class="tree">
+        """
+    html += structure_to_html(structure)
+    html += """
+            </div>
+        </body>
+        </html>
+        """
+    return html
+
+
+def export_json(structure):
+    return json.dumps(structure, indent=2)
+
+
+def structure_to_text(structure, level=0):
+    text = ""
+    indent = "    " * level
+    for name, contents in structure.items():
+        text += f"{indent}├── {name}\n"
+        if contents:
+            text += structure_to_text(contents, level + 1)
+    return text
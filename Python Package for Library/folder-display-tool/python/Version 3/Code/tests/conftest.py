@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+# Import the package from this checkout rather than an installed release
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Relative paths of the sample tree; a trailing '/' makes an (empty) folder
+SAMPLE_PATHS = (
+    'README.md',
+    'setup.py',
+    '.hidden_file',
+    '.config/settings.ini',
+    'src/main.py',
+    'src/util.py',
+    'src/pkg/__init__.py',
+    'src/pkg/core.py',
+    'src/pkg/deep/er/leaf.txt',
+    'src/empty/',
+    'docs/index.rst',
+    'docs/_build/index.html',
+    'node_modules/lib/index.js',
+    'data/a.csv',
+    'data/b.csv',
+)
+
+
+def make_tree(root, paths):
+    """Create files (with their path as content) and folders under root"""
+    for rel_path in paths:
+        full_path = os.path.join(root, *rel_path.rstrip('/').split('/'))
+        if rel_path.endswith('/'):
+            os.makedirs(full_path, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w', encoding='utf-8') as f:
+                f.write(rel_path)
+
+
+@pytest.fixture
+def sample_tree(tmp_path):
+    root = tmp_path / 'sample'
+    make_tree(str(root), SAMPLE_PATHS)
+    return str(root)
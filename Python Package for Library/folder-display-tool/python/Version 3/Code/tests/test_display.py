@@ -0,0 +1,89 @@
+import pytest
+
+import baseline
+from folder_display import FolderDisplay, ScanCache
+
+# Scanner settings that must not change the output: (name, setup)
+VARIANTS = [
+    ('serial', lambda fd: None),
+    ('threads', lambda fd: fd.set_workers(4)),
+    ('processes', lambda fd: (fd.set_workers(2), fd.set_use_processes(True))),
+    ('compact', lambda fd: fd.set_compact(True)),
+    ('cache', lambda fd: fd.set_cache(ScanCache())),
+]
+
+# Options the 1.0.0 scan supported: (include_hidden, excluded_folders)
+OPTIONS = [
+    (False, []),
+    (True, []),
+    (False, ['node_modules', 'deep']),
+    (True, ['.config', 'pkg']),
+]
+
+
+def make_display(setup, include_hidden, excluded):
+    fd = FolderDisplay()
+    setup(fd)
+    fd.set_include_hidden(include_hidden)
+    fd.set_excluded_folders(excluded)
+    return fd
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(params=VARIANTS, ids=[name for name, _ in VARIANTS])
+def setup(request):
+    return request.param[1]
+
+
+@pytest.mark.parametrize('include_hidden, excluded', OPTIONS)
+def test_display_matches_baseline(sample_tree, setup, include_hidden, excluded):
+    fd = make_display(setup, include_hidden, excluded)
+    expected = baseline.format_structure(baseline.get_structure(sample_tree, excluded, include_hidden))
+    assert fd.display(sample_tree) == expected
+    # Scanning twice (a warm cache) gives the same result
+    assert fd.display(sample_tree) == expected
+    assert fd.display(sample_tree, indent="\t") == baseline.format_structure(
+        baseline.get_structure(sample_tree, excluded, include_hidden), indent="\t")
+
+
+@pytest.mark.parametrize('include_hidden, excluded', OPTIONS)
+def test_structure_matches_baseline(sample_tree, setup, include_hidden, excluded):
+    fd = make_display(setup, include_hidden, excluded)
+    structure = fd.get_structure(sample_tree)
+    expected = baseline.get_structure(sample_tree, excluded, include_hidden)
+    if hasattr(structure, 'tree'):
+        structure = structure.tree.to_dict()
+    assert structure == expected
+    assert list(structure) == list(expected)
+
+
+@pytest.mark.parametrize('include_hidden, excluded', OPTIONS)
+def test_exports_match_baseline(sample_tree, tmp_path, setup, include_hidden, excluded):
+    fd = make_display(setup, include_hidden, excluded)
+    structure = baseline.get_structure(sample_tree, excluded, include_hidden)
+
+    fd.export_text(sample_tree, str(tmp_path / 'out.txt'))
+    assert read_bytes(tmp_path / 'out.txt') == baseline.structure_to_text(structure).encode('utf-8')
+
+    fd.export_html(sample_tree, str(tmp_path / 'out.html'))
+    assert read_bytes(tmp_path / 'out.html') == baseline.export_html(structure).encode('utf-8')
+
+    fd.export_json(sample_tree, str(tmp_path / 'out.json'))
+    assert read_bytes(tmp_path / 'out.json') == baseline.export_json(structure).encode('utf-8')
+
+
+def test_exports_of_an_empty_folder(tmp_path):
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    fd = FolderDisplay()
+    assert fd.display(str(empty)) == baseline.format_structure({})
+    fd.export_text(str(empty), str(tmp_path / 'out.txt'))
+    fd.export_html(str(empty), str(tmp_path / 'out.html'))
+    fd.export_json(str(empty), str(tmp_path / 'out.json'))
+    assert read_bytes(tmp_path / 'out.txt') == b''
+    assert read_bytes(tmp_path / 'out.html') == baseline.export_html({}).encode('utf-8')
+    assert read_bytes(tmp_path / 'out.json') == baseline.export_json({}).encode('utf-8')
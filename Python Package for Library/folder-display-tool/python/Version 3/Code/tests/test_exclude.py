@@ -0,0 +1,153 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import make_tree
+from folder_display import FolderDisplay, PathFilter
+
+needs_git = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+TREE = (
+    'app.log',
+    'keep.log',
+    'notes.txt',
+    'rootonly.txt',
+    'abc.txt',
+    'a1c.txt',
+    'abbc.txt',
+    '1.dat',
+    'x.dat',
+    '#hash.txt',
+    '!bang.txt',
+    'build/out.o',
+    'src/build',
+    'src/rootonly.txt',
+    'src/main.py',
+    'src/debug.log',
+    'src/cache/blob',
+    'docs/x.tmp',
+    'docs/a/b/c.tmp',
+    'docs/a/b/c.md',
+    'docs/special.tmp',
+    'a/b/file',
+    'a/x/b/file',
+    'a/x/y/b/file',
+    'a/bb/file',
+    'logs/today.log',
+    'logs/sub/old.txt',
+    'sub/readme.txt',
+    'sub/other.txt',
+    'sub/local.md',
+    'sub/deeper/local.md',
+    'sub/deeper/more.txt',
+    'sub/deeper/readme.txt',
+)
+
+PATTERNS = [
+    ['*.log', '!keep.log'],
+    ['build/'],
+    ['/rootonly.txt'],
+    ['a?c.txt', '[0-9]*.dat'],
+    ['\\#hash.txt', '\\!bang.txt'],
+    ['docs/**/*.tmp', '!special.tmp'],
+    ['**/cache'],
+    ['a/**/b'],
+    ['logs/**'],
+    ['src/*'],
+    ['*', '!*/', '!*.py'],
+    ['# a comment', '', 'notes.txt', 'missing/'],
+    ['sub', '!sub/readme.txt'],
+]
+
+# .gitignore files below the root, in addition to the root patterns
+NESTED = {
+    'sub/.gitignore': '*.txt\n!readme.txt\n/local.md\n',
+    'sub/deeper/.gitignore': '!more.txt\n',
+}
+
+
+def git_visible(root):
+    """Files git would list as untracked, with the user's global excludes disabled"""
+    env = dict(os.environ, GIT_CONFIG_GLOBAL=os.devnull, GIT_CONFIG_NOSYSTEM='1')
+    subprocess.run(['git', 'init', '-q'], cwd=root, env=env, check=True)
+    output = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard', '-z'],
+                            cwd=root, env=env, check=True, stdout=subprocess.PIPE).stdout
+    return {path for path in output.decode('utf-8').split('\0') if path}
+
+
+def scanner_visible(root, patterns=(), read_gitignore=False):
+    fd = FolderDisplay()
+    fd.set_include_hidden(True)
+    fd.set_excluded_folders(['.git'])
+    fd.set_exclude_patterns(patterns)
+    fd.set_read_gitignore(read_gitignore)
+    return {os.path.relpath(entry.path, root).replace(os.sep, '/')
+            for entry in fd.iter_entries(root) if not entry.is_dir}
+
+
+@needs_git
+@pytest.mark.parametrize('patterns', PATTERNS, ids=' '.join)
+def test_patterns_match_git(tmp_path, patterns):
+    root = str(tmp_path)
+    make_tree(root, TREE)
+    expected = scanner_visible(root, patterns)
+    with open(os.path.join(root, '.gitignore'), 'w') as f:
+        f.write('\n'.join(patterns) + '\n')
+    # Read from the file, the same patterns also apply to the .gitignore itself
+    assert scanner_visible(root, read_gitignore=True) == git_visible(root)
+    assert expected == git_visible(root) - {'.gitignore'}
+
+
+@needs_git
+@pytest.mark.parametrize('patterns', PATTERNS, ids=' '.join)
+def test_nested_gitignore_matches_git(tmp_path, patterns):
+    root = str(tmp_path)
+    make_tree(root, TREE)
+    for rel_path, text in NESTED.items():
+        with open(os.path.join(root, rel_path), 'w') as f:
+            f.write(text)
+    with open(os.path.join(root, '.gitignore'), 'w') as f:
+        f.write('\n'.join(patterns) + '\n')
+    assert scanner_visible(root, read_gitignore=True) == git_visible(root)
+
+
+@needs_git
+def test_gitignore_overrides_given_patterns(tmp_path):
+    root = str(tmp_path)
+    make_tree(root, TREE)
+    with open(os.path.join(root, 'sub', '.gitignore'), 'w') as f:
+        f.write('!*.txt\n')
+    visible = scanner_visible(root, ['*.txt'], read_gitignore=True)
+    assert 'notes.txt' not in visible
+    assert {'sub/readme.txt', 'sub/other.txt', 'sub/deeper/more.txt'} <= visible
+
+
+def test_rules_for(tmp_path):
+    root = str(tmp_path)
+    make_tree(root, TREE)
+    path_filter = PathFilter(['*.log', '!keep.log', 'build/', '/rootonly.txt', 'docs/a'])
+    path_filter.start(root)
+    top = path_filter.rules_for(root)
+    assert top.excludes('app.log', False)
+    assert not top.excludes('keep.log', False)
+    assert top.excludes('build', True)
+    assert not top.excludes('build', False)
+    assert top.excludes('rootonly.txt', False)
+    assert not top.excludes('docs', True)
+
+    src = path_filter.rules_for(os.path.join(root, 'src'))
+    assert src.excludes('debug.log', False)
+    assert not src.excludes('rootonly.txt', False)
+    assert not src.excludes('build', False)
+    docs = path_filter.rules_for(os.path.join(root, 'docs'))
+    assert docs.excludes('a', True)
+    # Returning to a folder after one of its siblings gives its rules again
+    assert path_filter.rules_for(os.path.join(root, 'src')).excludes('x.log', False)
+
+
+def test_no_patterns_means_no_rules(tmp_path):
+    path_filter = PathFilter()
+    path_filter.start(str(tmp_path))
+    assert path_filter.rules_for(str(tmp_path)) is None
@@ -0,0 +1,163 @@
+import os
+import shutil
+import time
+
+import pytest
+
+import baseline
+from conftest import make_tree
+from folder_display import DiffEntry, FolderDisplay, Snapshot
+
+COMPRESSIONS = [None, 'zlib', 'lzma']
+
+
+def age_tree(root, seconds=60):
+    """Move every mtime into the past, so stamps of the next scan are not UNKNOWN"""
+    past = time.time() - seconds
+    for dir_path, dir_names, file_names in os.walk(root):
+        for name in file_names:
+            os.utime(os.path.join(dir_path, name), (past, past))
+        os.utime(dir_path, (past, past))
+
+
+def save_and_load(snapshot, tmp_path, compress=None):
+    file = str(tmp_path / 'tree.snap')
+    snapshot.save(file, compress=compress)
+    return Snapshot.load(file)
+
+
+@pytest.mark.parametrize('compress', COMPRESSIONS)
+@pytest.mark.parametrize('stamps', [False, True])
+def test_round_trip(sample_tree, tmp_path, compress, stamps):
+    fd = FolderDisplay()
+    fd.set_include_hidden(True)
+    snapshot = fd.snapshot(sample_tree, stamps=stamps)
+    loaded = save_and_load(snapshot, tmp_path, compress)
+
+    assert loaded.path == snapshot.path
+    assert loaded.options == snapshot.options
+    assert abs((loaded.created - snapshot.created).total_seconds()) < 1e-3
+    assert (loaded.stamps is None) == (not stamps)
+    assert loaded.structure.tree.to_dict() == snapshot.structure
+    assert list(loaded.entries()) == list(snapshot.entries())
+    assert loaded.render() == snapshot.render() == fd.display(sample_tree)
+    assert loaded.to_text() == snapshot.to_text()
+    assert loaded.to_html() == snapshot.to_html()
+    assert loaded.to_json() == snapshot.to_json()
+    assert loaded.to_ndjson() == snapshot.to_ndjson()
+    assert loaded.to_json() == baseline.export_json(baseline.get_structure(sample_tree, include_hidden=True))
+    assert loaded.diff(snapshot) == snapshot.diff(loaded) == []
+
+
+@pytest.mark.parametrize('compress', COMPRESSIONS)
+def test_resave_loaded(sample_tree, tmp_path, compress):
+    snapshot = FolderDisplay().snapshot(sample_tree, stamps=True)
+    loaded = save_and_load(snapshot, tmp_path)
+    (tmp_path / 'again').mkdir()
+    reloaded = save_and_load(loaded, tmp_path / 'again', compress)
+    assert reloaded.structure.tree.to_dict() == snapshot.structure
+    assert reloaded.to_text() == snapshot.to_text()
+
+
+def test_round_trip_empty_folder(tmp_path):
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    snapshot = FolderDisplay().snapshot(str(empty))
+    loaded = save_and_load(snapshot, tmp_path)
+    assert dict(loaded.structure) == {}
+    assert loaded.render() == ''
+
+
+def test_subtree(sample_tree, tmp_path):
+    loaded = save_and_load(FolderDisplay().snapshot(sample_tree), tmp_path)
+    assert sorted(loaded.subtree('src/pkg')) == ['__init__.py', 'core.py', 'deep']
+    assert dict(loaded.subtree(os.path.join('src', 'empty'))) == {}
+    with pytest.raises(NotADirectoryError):
+        loaded.subtree('src/main.py')
+    with pytest.raises(KeyError):
+        loaded.subtree('missing')
+
+
+def test_limited_render(sample_tree):
+    fd = FolderDisplay()
+    fd.set_max_depth(1)
+    fd.set_max_entries_per_dir(2)
+    assert fd.snapshot(sample_tree).render() == fd.display(sample_tree)
+
+
+def change_tree(root):
+    """Apply one of each kind of change; return the expected diff"""
+    os.remove(os.path.join(root, 'setup.py'))
+    shutil.rmtree(os.path.join(root, 'src', 'pkg', 'deep'))
+    make_tree(root, ('src/new.py', 'src/added/one.txt', 'src/added/two/'))
+    os.remove(os.path.join(root, 'data', 'a.csv'))
+    make_tree(root, ('data/a.csv/part-0',))
+    shutil.rmtree(os.path.join(root, 'src', 'empty'))
+    make_tree(root, ('src/empty',))
+    return [
+        DiffEntry('removed', os.path.join(root, 'setup.py'), False),
+        DiffEntry('changed', os.path.join(root, 'data', 'a.csv'), True),
+        DiffEntry('added', os.path.join(root, 'src', 'added'), True),
+        DiffEntry('changed', os.path.join(root, 'src', 'empty'), False),
+        DiffEntry('added', os.path.join(root, 'src', 'new.py'), False),
+        DiffEntry('removed', os.path.join(root, 'src', 'pkg', 'deep'), True),
+    ]
+
+
+def sort_diff(changes):
+    return sorted(changes, key=lambda change: change.path)
+
+
+@pytest.mark.parametrize('stamps', [False, True])
+def test_diff_against_rescan(sample_tree, stamps):
+    age_tree(sample_tree)
+    fd = FolderDisplay()
+    snapshot = fd.snapshot(sample_tree, stamps=stamps)
+    assert fd.diff(snapshot) == []
+    expected = change_tree(sample_tree)
+    assert sort_diff(fd.diff(snapshot)) == sort_diff(expected)
+
+
+@pytest.mark.parametrize('compress', COMPRESSIONS)
+@pytest.mark.parametrize('stamps', [False, True])
+def test_diff_between_loaded_snapshots(sample_tree, tmp_path, compress, stamps):
+    age_tree(sample_tree)
+    fd = FolderDisplay()
+    (tmp_path / 'old').mkdir()
+    (tmp_path / 'new').mkdir()
+    old = save_and_load(fd.snapshot(sample_tree, stamps=stamps), tmp_path / 'old', compress)
+    expected = change_tree(sample_tree)
+    new = fd.snapshot(sample_tree, stamps=stamps)
+    loaded_new = save_and_load(new, tmp_path / 'new', compress)
+    assert sort_diff(old.diff(new)) == sort_diff(expected)
+    assert sort_diff(old.diff(loaded_new)) == sort_diff(expected)
+    reverse = {'added': 'removed', 'removed': 'added', 'changed': 'changed'}
+    assert sort_diff(loaded_new.diff(old)) == sort_diff(
+        DiffEntry(reverse[change.kind], change.path,
+                  not change.is_dir if change.kind == 'changed' else change.is_dir)
+        for change in expected)
+
+
+def test_diff_order(sample_tree):
+    fd = FolderDisplay()
+    snapshot = fd.snapshot(sample_tree)
+    expected = change_tree(sample_tree)
+    # Folder by folder from the root, names sorted within each folder
+    assert fd.diff(snapshot) == expected
+
+
+def test_stamps_skip_unchanged_subtrees(sample_tree):
+    age_tree(sample_tree)
+    fd = FolderDisplay()
+    snapshot = fd.snapshot(sample_tree, stamps=True)
+    pkg = os.path.join(sample_tree, 'src', 'pkg')
+    stat = os.stat(pkg)
+    # A rename that keeps the folder's entry count and mtime is invisible to stamps...
+    os.rename(os.path.join(pkg, 'core.py'), os.path.join(pkg, 'kernel.py'))
+    os.utime(pkg, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert fd.diff(snapshot) == []
+    # ...but not to a full comparison
+    assert sort_diff(snapshot.diff(fd.snapshot(sample_tree))) == [
+        DiffEntry('removed', os.path.join(pkg, 'core.py'), False),
+        DiffEntry('added', os.path.join(pkg, 'kernel.py'), False),
+    ]
@@ -1,9 +1,10 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 setup(
     name="folder-display",
     version="1.0.0",
-    packages=find_packages(),
+    packages=["folder_display"],
+    package_dir={"folder_display": "folder-display-tool/python/Version 3/Code/folder_display"},
     install_requires=[],
     author="Arjun Mehta",
     author_email="your.email@example.com",
@@ -15,6 +16,7 @@ setup(
     - Export to various formats (Text, HTML, JSON)
     - Exclude specific folders (e.g., node_modules)
     - Include/exclude hidden files
+    - A `folder-display` command (scan, display, export, analyze, search)
     """,
     long_description_content_type="text/markdown",
     url="https://github.com/Arjunmehta312/folder-display-tool",
@@ -23,5 +25,10 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    entry_points={
+        "console_scripts": [
+            "folder-display=folder_display.cli:main",
+        ],
+    },
+    python_requires=">=3.7",
 ) 
\ No newline at end of file